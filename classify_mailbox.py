@@ -0,0 +1,214 @@
+import os
+import sys
+import csv
+import json
+import time
+import argparse
+import mailbox
+from collections import deque
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+import url_utils
+from email_parsing import parse_message, message_text
+from model_loader import load_models, predict_probabilities, LABEL_MAPPING, MODEL_TFIDF, MODEL_BOW, VECTORIZER_TFIDF, VECTORIZER_BOW
+from url_utils import extract_urls, check_urls, load_master_url_dataset, get_phishing_urls
+
+CHUNK_SIZE = 500
+N_WORKERS = os.cpu_count() or 1
+OUTPUT_FIELDS = ["id", "predicted_label", "prob_safe", "prob_spam", "prob_phishing", "url_risk", "risk_source"]
+
+_models = None
+_phishing_urls = None
+
+# loads the model bundle and url databases once per worker process with the chosen blocklist mode
+# and silences per-email logging
+def _init_worker(blocklist_mode=url_utils.BLOCKLIST_MODE, bloom_fp_rate=url_utils.BLOOM_FALSE_POSITIVE_RATE):
+    global _models, _phishing_urls
+    url_utils.BLOCKLIST_MODE = blocklist_mode
+    url_utils.BLOOM_FALSE_POSITIVE_RATE = bloom_fp_rate
+    _models = load_models()
+    load_master_url_dataset()
+    _phishing_urls = get_phishing_urls()
+    sys.stdout = open(os.devnull, "w")
+
+# returns the text to classify for a raw message or a csv cell
+def item_text(raw):
+    if not isinstance(raw, bytes):
+        return "" if pd.isna(raw) else str(raw)
+    try:
+        return message_text(parse_message(raw))
+    except Exception:
+        return ""
+
+# classifies a chunk of (id, raw message) items and returns one result row per item
+def classify_chunk(chunk):
+    texts = [item_text(raw) for _, raw in chunk]
+    probs = predict_probabilities(texts, _models)
+    rows = []
+    for (item_id, _), text, prob in zip(chunk, texts, probs):
+        urls = extract_urls(text)
+        url_risk, risk_source = check_urls(urls, _phishing_urls, record=False) if urls else (0, "none")
+        predicted_label = LABEL_MAPPING[int(prob.argmax())]
+        if url_risk == 2:
+            predicted_label = "phishing email"
+            prob[2] = 1.0
+        rows.append({
+            "id": item_id,
+            "predicted_label": predicted_label,
+            "prob_safe": round(float(prob[0]), 6),
+            "prob_spam": round(float(prob[1]), 6),
+            "prob_phishing": round(float(prob[2]), 6),
+            "url_risk": url_risk,
+            "risk_source": risk_source
+        })
+    return rows
+
+# guesses the input format from the path
+def detect_format(path):
+    if os.path.isdir(path):
+        if all(os.path.isdir(os.path.join(path, d)) for d in ("cur", "new", "tmp")):
+            return "maildir"
+        return "eml"
+    return "csv" if path.lower().endswith(".csv") else "mbox"
+
+# yields (id, raw message bytes or text) for every message in the input
+def iter_messages(path, input_format, column="email_text"):
+    if input_format in ("mbox", "maildir"):
+        box = mailbox.mbox(path, create=False) if input_format == "mbox" else mailbox.Maildir(path, factory=None, create=False)
+        for key in box.iterkeys():
+            yield str(key), box.get_bytes(key)
+    elif input_format == "eml":
+        for root, dirs, files_list in os.walk(path):
+            dirs.sort()
+            for file_name in sorted(files_list):
+                if file_name.lower().endswith(".eml"):
+                    file_path = os.path.join(root, file_name)
+                    with open(file_path, "rb") as f:
+                        yield os.path.relpath(file_path, path), f.read()
+    elif input_format == "csv":
+        row = 0
+        for chunk in pd.read_csv(path, usecols=[column], dtype=str, chunksize=CHUNK_SIZE):
+            for text in chunk[column]:
+                yield str(row), text
+                row += 1
+    else:
+        raise ValueError(f"unknown input format: {input_format}")
+
+# trims a partially written last line and returns the ids already written to the output file
+def load_done_ids(output_path):
+    if not os.path.exists(output_path):
+        return set()
+    with open(output_path, "rb+") as f:
+        data = f.read()
+        if data and not data.endswith(b"\n"):
+            f.truncate(data.rfind(b"\n") + 1)
+    done = set()
+    with open(output_path, "r", encoding="utf-8", newline="") as f:
+        if output_path.endswith(".jsonl"):
+            for line in f:
+                try:
+                    done.add(json.loads(line)["id"])
+                except (ValueError, KeyError):
+                    pass
+        else:
+            for row in csv.DictReader(f):
+                if all(row.get(field) not in (None, "") for field in OUTPUT_FIELDS):
+                    done.add(row["id"])
+    return done
+
+# appends result rows to a csv or jsonl output file and flushes them to disk
+def write_rows(f, rows, jsonl):
+    if jsonl:
+        f.write("".join(json.dumps(row) + "\n" for row in rows))
+    else:
+        csv.DictWriter(f, fieldnames=OUTPUT_FIELDS).writerows(rows)
+    f.flush()
+
+# yields chunks of messages that are not in the output yet
+def iter_chunks(messages, done, chunk_size):
+    pending = ((item_id, raw) for item_id, raw in messages if item_id not in done)
+    while True:
+        chunk = list(islice(pending, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+# classifies every message in a mailbox, eml directory or csv column and writes verdicts incrementally
+def classify_mailbox(input_path, output_path, input_format="auto", column="email_text",
+                     n_workers=N_WORKERS, chunk_size=CHUNK_SIZE, resume=True,
+                     blocklist_mode=url_utils.BLOCKLIST_MODE, bloom_fp_rate=url_utils.BLOOM_FALSE_POSITIVE_RATE):
+    print("[INFO] starting bulk mailbox classification...")
+    missing = [p for p in (MODEL_TFIDF, MODEL_BOW, VECTORIZER_TFIDF, VECTORIZER_BOW) if not os.path.exists(p)]
+    if missing:
+        print(f"[ERROR] model files not found: {missing}. run train_email_classifier.py first.")
+        return
+    if not os.path.exists(input_path):
+        print(f"[ERROR] input not found -> {input_path}")
+        return
+    if input_format == "auto":
+        input_format = detect_format(input_path)
+    jsonl = output_path.endswith(".jsonl")
+    if not resume and os.path.exists(output_path):
+        os.remove(output_path)
+    done = load_done_ids(output_path)
+    if done:
+        print(f"[INFO] resuming. skipping {len(done)} already classified messages.")
+    if blocklist_mode == "bloom" and os.path.exists(url_utils.CACHE_FILE):
+        from phishing_blocklist import ensure_blocklist_files
+        ensure_blocklist_files(url_utils.CACHE_FILE, bloom_fp_rate)  # built once here instead of in every worker
+    print(f"[INFO] reading {input_format} input from {input_path} with {n_workers} workers "
+          f"({blocklist_mode} blocklist)...")
+    new_file = not os.path.exists(output_path) or os.path.getsize(output_path) == 0
+    classified = 0
+    counts = {label: 0 for label in LABEL_MAPPING.values()}
+    start = time.perf_counter()
+    with open(output_path, "a", encoding="utf-8", newline="") as f, \
+            ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker,
+                                initargs=(blocklist_mode, bloom_fp_rate)) as pool:
+        if new_file and not jsonl:
+            csv.DictWriter(f, fieldnames=OUTPUT_FIELDS).writeheader()
+        in_flight = deque()
+
+        # writes finished chunks in input order until at most `limit` chunks are still running
+        def drain(limit):
+            nonlocal classified
+            while len(in_flight) > limit:
+                rows = in_flight.popleft().result()
+                write_rows(f, rows, jsonl)
+                classified += len(rows)
+                for row in rows:
+                    counts[row["predicted_label"]] += 1
+                elapsed = time.perf_counter() - start
+                print(f"[INFO] classified {classified} messages ({classified / elapsed:.1f} messages/s)")
+
+        for chunk in iter_chunks(iter_messages(input_path, input_format, column), done, chunk_size):
+            in_flight.append(pool.submit(classify_chunk, chunk))
+            drain(2 * n_workers - 1)
+        drain(0)
+    elapsed = time.perf_counter() - start
+    rate = classified / elapsed if elapsed else 0.0
+    print(f"[INFO] verdicts: {counts}")
+    print(f"[SUCCESS] finished classifying {classified} messages in {elapsed:.2f} seconds "
+          f"({rate:.1f} messages/s). saved -> {output_path}")
+
+# parses command line arguments and runs the bulk classifier
+def main():
+    parser = argparse.ArgumentParser(description="Classify every email in an mbox, Maildir, .eml directory or csv column.")
+    parser.add_argument("input", help="path to an mbox file, Maildir, directory of .eml files or csv file")
+    parser.add_argument("output", help="output file; .jsonl writes json lines, anything else writes csv")
+    parser.add_argument("--format", default="auto", choices=["auto", "mbox", "maildir", "eml", "csv"])
+    parser.add_argument("--column", default="email_text", help="csv column holding the email text")
+    parser.add_argument("--workers", type=int, default=N_WORKERS)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--no-resume", action="store_true", help="overwrite the output instead of resuming")
+    parser.add_argument("--blocklist-mode", default=url_utils.BLOCKLIST_MODE, choices=["set", "bloom"],
+                        help="hold the phishing blocklist in memory or memory-map a bloom filter shared by all workers")
+    parser.add_argument("--bloom-fp-rate", type=float, default=url_utils.BLOOM_FALSE_POSITIVE_RATE,
+                        help="bloom filter false positive rate; hits are confirmed against the exact on-disk index")
+    args = parser.parse_args()
+    classify_mailbox(args.input, args.output, args.format, args.column, args.workers, args.chunk_size,
+                     not args.no_resume, args.blocklist_mode, args.bloom_fp_rate)
+
+if __name__ == "__main__":
+    main()
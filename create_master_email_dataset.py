@@ -1,9 +1,12 @@
 import pandas as pd
 import os
 import re
+from dataset_schema import read_email_dataset, concat_email_frames, TEXT_DTYPE, LABEL_DTYPE, INVALID_LABEL
 
 DATASET_PATH = "master_email_dataset.csv"
 USER_PROVIDED_PATH = "user_provided_emails.csv"
+TEXT_SOURCE_COLUMNS = ["email text", "message", "text", "v2", "email_text"]
+TYPE_SOURCE_COLUMNS = ["spam/ham", "sentiment", "label", "v1", "email type", "email_type"]
 
 # removes html tags, punctuation, and extra spaces from text
 def clean_text(text):
@@ -32,11 +35,7 @@ def load_user_provided_data():
     if os.path.exists(USER_PROVIDED_PATH):
         print("[INFO] merging user-provided email dataset...")
         try:
-            user_df = pd.read_csv(
-                USER_PROVIDED_PATH,
-                dtype=str,
-                names=["email_text", "email_type", "email_label"]
-            )
+            user_df = read_email_dataset(USER_PROVIDED_PATH, header=None)
             print(f"[SUCCESS] loaded {len(user_df)} user-provided emails.")
             return user_df
         except Exception as e:
@@ -53,23 +52,27 @@ def main():
         return
     print("[INFO] processing unified_email_dataset.csv...")
     try:
-        df = pd.read_csv(dataset_path, low_memory=True, dtype=str)
+        source_columns = set(TEXT_SOURCE_COLUMNS + TYPE_SOURCE_COLUMNS)
+        df = pd.read_csv(
+            dataset_path,
+            low_memory=True,
+            dtype=TEXT_DTYPE,
+            usecols=lambda c: c.lower().strip() in source_columns
+        )
         print(f"[SUCCESS] columns found: {df.columns.tolist()}")
     except Exception as e:
         print(f"[ERROR] could not read unified_email_dataset.csv: {e}")
         return
     df.columns = [col.lower().strip() for col in df.columns]
-    df = unify_columns(df, ["email text", "message", "text", "v2", "email_text"], "email_text")
-    df = unify_columns(df, ["spam/ham", "sentiment", "label", "v1", "email type", "email_type"], "email_type")
-    df.drop(columns=["url", "email", "phone", "message id", "subject", "date", "textid", "selected_text"],
-            inplace=True, errors="ignore")
+    df = unify_columns(df, TEXT_SOURCE_COLUMNS, "email_text")
+    df = unify_columns(df, TYPE_SOURCE_COLUMNS, "email_type")
     if "email_text" not in df.columns or "email_type" not in df.columns:
         print(f"[ERROR] missing required columns. found: {df.columns.tolist()}")
         return
-    df["email_text"] = df["email_text"].fillna("").astype(str)
-    df["email_type"] = df["email_type"].fillna("").astype(str)
+    df["email_text"] = df["email_text"].fillna("")
+    df["email_type"] = df["email_type"].fillna("")
     df = df[~df["email_type"].str.lower().eq("unknown")]
-    df["email_text"] = df["email_text"].apply(clean_text)
+    df["email_text"] = df["email_text"].map(clean_text).astype(TEXT_DTYPE)
     label_map = {
         "spam": "spam email",
         "smishing": "phishing email",
@@ -90,18 +93,16 @@ def main():
         "safe email": 0,
         "spam email": 1,
         "phishing email": 2
-    }).fillna(-1).astype(int)
+    }).fillna(INVALID_LABEL).astype(LABEL_DTYPE)
     df.dropna(subset=["email_text", "email_type"], inplace=True)
     invalid_types = {"nan", "please review your account security settings."}
     df = df[~df["email_type"].str.lower().isin(invalid_types)]
-    df = df[df["email_label"] != -1]
+    df = df[df["email_label"] != INVALID_LABEL]
     user_df = load_user_provided_data()
     if not user_df.empty:
-        user_df["email_type"] = user_df["email_type"].fillna("").astype(str)
-        user_df = user_df[~user_df["email_type"].str.lower().isin(invalid_types)]
-        user_df["email_label"] = pd.to_numeric(user_df["email_label"], errors="coerce").fillna(-1).astype(int)
-        user_df = user_df[user_df["email_label"] != -1]
-    df = pd.concat([df, user_df], ignore_index=True).drop_duplicates(subset=["email_text"])
+        user_df = user_df[~user_df["email_type"].astype(str).str.lower().isin(invalid_types)]
+        user_df = user_df[user_df["email_label"] != INVALID_LABEL]
+    df = concat_email_frames([df, user_df]).drop_duplicates(subset=["email_text"])
     df.to_csv(DATASET_PATH, index=False)
     print(f"[SUCCESS] finished. saved -> {DATASET_PATH}")
 
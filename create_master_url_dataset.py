@@ -1,88 +1,92 @@
 import pandas as pd
+import numpy as np
 import os
+from dataset_schema import read_url_dataset, compact_url_frame, URL_COLUMNS, LABEL_DTYPE, INVALID_LABEL
+from create_unified_url_dataset import clean_phishing_url_data, read_url_chunks, CHUNK_SIZE
 
 DATA_DIR = "data"
 DATASET_PATH = "master_url_dataset.csv"
 USER_PROVIDED_PATH = "user_provided_urls.csv"
 
+URL_LABEL_MAP = {
+    "bad": 2,
+    "safe": 0,
+    "good": 0,
+    "0": 0,
+    "1": 2
+}
+
 FILES = {
     "tarun": os.path.join(DATA_DIR, "tarun_phishing_urls/phishing_site_urls.csv"),
     "phiusiil": os.path.join(DATA_DIR, "phiusill_phishing_urls/PhiUSIIL_Phishing_URL_Dataset.csv")
 }
 
-# processes phishing url datasets from given files and returns a concatenated dataframe
-def clean_phishing_url_data(files):
-    print("[INFO] starting phishing URL dataset creation...")
-    dfs = []
-    for source, file_path in files.items():
-        if os.path.exists(file_path):
-            print(f"[INFO] processing dataset from '{source}'...")
-            try:
-                df = pd.read_csv(file_path, dtype=str, low_memory=False)
-                df.columns = [col.lower() for col in df.columns]
-                required_columns = ["url", "label"]
-                df = df[[col for col in required_columns if col in df.columns]]
-                dfs.append(df)
-                print(f"[SUCCESS] finished processing dataset from '{source}'. Rows -> {len(df)}")
-            except Exception as e:
-                print(f"[ERROR] finished processing dataset from '{source}' with failure: {e}")
-        else:
-            print(f"[ERROR] file not found: {file_path}")
-    if not dfs:
-        print("[ERROR] finished phishing URL dataset creation with no data found.")
-        return pd.DataFrame(columns=["url", "label"])
-    print("[SUCCESS] finished phishing URL dataset creation successfully.")
-    return pd.concat(dfs, ignore_index=True)
-
 # loads user provided urls from csv file if available
 def load_user_provided_data():
     if os.path.exists(USER_PROVIDED_PATH):
         print("[INFO] merging user-provided URL dataset...")
         try:
-            user_df = pd.read_csv(USER_PROVIDED_PATH, dtype=str, names=["url", "label"])
+            user_df = read_url_dataset(USER_PROVIDED_PATH, header=None)
             print(f"[SUCCESS] loaded {len(user_df)} user-provided URLs.")
             return user_df
         except Exception as e:
             print(f"[ERROR] failed to load user-provided URLs: {e}")
-            return pd.DataFrame(columns=["url", "label"])
-    return pd.DataFrame(columns=["url", "label"])
+            return compact_url_frame(pd.DataFrame(columns=["url", "label"]))
+    return compact_url_frame(pd.DataFrame(columns=["url", "label"]))
+
+# maps raw url labels to 0 (safe) and 2 (phishing), leaving unknown labels empty
+def map_url_labels(labels):
+    return labels.astype(str).str.lower().str.strip().map(URL_LABEL_MAP)
+
+# returns a mask of rows whose url hash has not been seen yet and records the new hashes
+def first_seen_mask(urls, seen):
+    hashes = pd.util.hash_pandas_object(urls, index=False).tolist()
+    mask = np.zeros(len(hashes), dtype=bool)
+    for i, url_hash in enumerate(hashes):
+        if url_hash not in seen:
+            seen.add(url_hash)
+            mask[i] = True
+    return mask
 
-# creates master url dataset from unified dataset and user provided data using label mapping
-def create_master_url_dataset():
+# creates master url dataset from unified dataset and user provided data using label mapping;
+# the unified dataset is streamed in chunks and deduplicated against a running set of url hashes
+def create_master_url_dataset(chunksize=CHUNK_SIZE):
     print("[INFO] starting master URL dataset creation...")
     dataset_path = "unified_url_dataset.csv"
     if not os.path.exists(dataset_path):
         print(f"[ERROR] {dataset_path} not found. Cannot create master URL dataset.")
         return
+    seen = set()
+    rows = 0
+    tmp_path = DATASET_PATH + ".tmp"
     try:
-        df = pd.read_csv(dataset_path, dtype=str, low_memory=False)
+        with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+            pd.DataFrame(columns=URL_COLUMNS).to_csv(f, index=False)
+            for chunk in read_url_chunks(dataset_path, chunksize):
+                chunk["label"] = map_url_labels(chunk["label"])
+                chunk = chunk.dropna(subset=["url", "label"])
+                chunk = compact_url_frame(chunk.astype({"label": LABEL_DTYPE}))
+                chunk = chunk[first_seen_mask(chunk["url"], seen)]
+                chunk.to_csv(f, header=False, index=False)
+                rows += len(chunk)
+            user_df = load_user_provided_data()
+            user_df = user_df[user_df["label"] != INVALID_LABEL].dropna(subset=["url"])
+            user_df = user_df[first_seen_mask(user_df["url"], seen)]
+            user_df.to_csv(f, header=False, index=False)
+            rows += len(user_df)
     except Exception as e:
         print(f"[ERROR] finished master URL dataset creation with failure: {e}")
         return
-    df.columns = [col.lower() for col in df.columns]
-    df = df.drop_duplicates(subset=["url"])
-    label_map = {
-        "bad": "2",
-        "safe": "0",
-        "good": "0",
-        "0": "0",
-        "1": "2"
-    }
-    df["label"] = df["label"].map(lambda x: label_map.get(x.lower().strip(), x))
-    df.dropna(subset=["url", "label"], inplace=True)
-    user_df = load_user_provided_data()
-    df = pd.concat([df, user_df], ignore_index=True).drop_duplicates(subset=["url"])
-    df.to_csv(DATASET_PATH, index=False)
+    os.replace(tmp_path, DATASET_PATH)
     print(f"[SUCCESS] finished master URL dataset creation. Saved -> {DATASET_PATH}")
-    print(f"[SUCCESS] loaded {len(df)} urls from master_url_dataset.csv")
+    print(f"[SUCCESS] loaded {rows} urls from master_url_dataset.csv")
 
 # executes the dataset processing pipeline
 def main():
     print("[INFO] starting dataset processing pipeline...")
-    phishing_urls_df = clean_phishing_url_data(FILES)
     output_file = "unified_url_dataset.csv"
-    phishing_urls_df.to_csv(output_file, index=False)
-    print(f"[SUCCESS] finished unified URL dataset creation. Saved -> {output_file}")
+    rows = clean_phishing_url_data(FILES, output_file)
+    print(f"[SUCCESS] finished unified URL dataset creation. Rows -> {rows}. Saved -> {output_file}")
     if os.path.exists(output_file):
         create_master_url_dataset()
     else:
@@ -10,7 +10,9 @@ files = {
     "oibsip_spam": os.path.join(data_dir, "oibsip_spam/spam.csv"),
     "wiechmann": os.path.join(data_dir, "wiechmann_emails/enron_spam_data.csv"),
     "suhasmaddali": os.path.join(data_dir, "suhasmaddali_emails/train.csv"),
-    "nahmias": os.path.join(data_dir, "nahmiasd_emails")
+    "nahmias": os.path.join(data_dir, "nahmiasd_emails"),
+    "diegoocampoh_enron": os.path.join(data_dir, "diegoocampoh_emails/emails-enron.csv"),
+    "diegoocampoh_phishing": os.path.join(data_dir, "diegoocampoh_emails/emails-phishing.csv")
 }
 
 # loads a csv file and returns a dataframe
@@ -59,9 +61,12 @@ def main():
     wiechmann_df = load_csv("wiechmann", files["wiechmann"])
     suhasmaddali_df = load_csv("suhasmaddali", files["suhasmaddali"])
     nahmias_df = load_nahmias_json(files["nahmias"])
+    diegoocampoh_enron_df = load_csv("diegoocampoh_enron", files["diegoocampoh_enron"])
+    diegoocampoh_phishing_df = load_csv("diegoocampoh_phishing", files["diegoocampoh_phishing"])
     print("[INFO] combining all processed datasets...")
     unified_df = pd.concat(
-        [utwente_df, sandhya_df, oibsip_spam_df, wiechmann_df, suhasmaddali_df, nahmias_df],
+        [utwente_df, sandhya_df, oibsip_spam_df, wiechmann_df, suhasmaddali_df, nahmias_df,
+         diegoocampoh_enron_df, diegoocampoh_phishing_df],
         ignore_index=True
     )
     output_file = "unified_email_dataset.csv"
@@ -1,38 +1,56 @@
 import pandas as pd
 import os
+from dataset_schema import TEXT_DTYPE, URL_COLUMNS
 
 DATA_DIR = "data"
 FILES = {
     "tarun": os.path.join(DATA_DIR, "tarun_phishing_urls/phishing_site_urls.csv"),
     "phiusiil": os.path.join(DATA_DIR, "phiusill_phishing_urls/PhiUSIIL_Phishing_URL_Dataset.csv")
 }
+CHUNK_SIZE = 100_000
 
-# processes phishing url datasets from given file paths and returns a concatenated dataframe
-def clean_phishing_url_data(files):
+# reads only the url and label columns of a url csv in chunks with lowercased column names
+def read_url_chunks(file_path, chunksize=CHUNK_SIZE):
+    for chunk in pd.read_csv(
+        file_path,
+        dtype=TEXT_DTYPE,
+        usecols=lambda c: c.lower() in URL_COLUMNS,
+        chunksize=chunksize
+    ):
+        chunk.columns = [col.lower() for col in chunk.columns]
+        yield chunk.reindex(columns=URL_COLUMNS)
+
+# streams the url and label columns of the phishing url datasets into one csv and returns the rows written
+def clean_phishing_url_data(files, output_file, chunksize=CHUNK_SIZE):
     print("[INFO] starting phishing URL dataset creation...")
-    dfs = []
-    for source, file_path in files.items():
-        if os.path.exists(file_path):
+    rows = 0
+    tmp_file = output_file + ".tmp"
+    with open(tmp_file, "w", encoding="utf-8", newline="") as f:
+        pd.DataFrame(columns=URL_COLUMNS).to_csv(f, index=False)
+        for source, file_path in files.items():
+            if not os.path.exists(file_path):
+                print(f"[ERROR] file not found: {file_path}")
+                continue
             print(f"[INFO] processing dataset from '{source}'...")
+            source_rows = 0
             try:
-                df = pd.read_csv(file_path)
-                df.columns = [col.lower() for col in df.columns]
-                dfs.append(df)
-                print(f"[SUCCESS] finished processing dataset from '{source}'. Rows: {len(df)}")
+                for chunk in read_url_chunks(file_path, chunksize):
+                    chunk.to_csv(f, header=False, index=False)
+                    source_rows += len(chunk)
+                print(f"[SUCCESS] finished processing dataset from '{source}'. Rows: {source_rows}")
             except Exception as e:
                 print(f"[ERROR] finished processing dataset from '{source}' with failure: {e}")
-        else:
-            print(f"[ERROR] file not found: {file_path}")
+            rows += source_rows
+    os.replace(tmp_file, output_file)
     print("[SUCCESS] finished phishing URL dataset creation.")
-    return pd.concat(dfs, ignore_index=True) if dfs else pd.DataFrame()
+    return rows
 
 # executes dataset processing and saves unified url dataset
 def main():
     print("[INFO] starting unified URL dataset generation...")
-    phishing_urls_df = clean_phishing_url_data({"tarun": FILES["tarun"], "phiusiil": FILES["phiusiil"]})
     output_file = "unified_url_dataset.csv"
-    phishing_urls_df.to_csv(output_file, index=False)
-    print(f"[SUCCESS] finished unified URL dataset generation. Saved -> {output_file}")
+    rows = clean_phishing_url_data({"tarun": FILES["tarun"], "phiusiil": FILES["phiusiil"]}, output_file)
+    print(f"[SUCCESS] finished unified URL dataset generation. Rows: {rows}. Saved -> {output_file}")
 
 if __name__ == "__main__":
     main()
@@ -1,11 +1,21 @@
 import pandas as pd
+import numpy as np
 import os
+import json
+from collections import Counter
 
 DATA_DIR = "data"
 FILES = {
     "tarun": os.path.join(DATA_DIR, "tarun_phishing_urls/phishing_site_urls.csv"),
     "phiusiil": os.path.join(DATA_DIR, "phiusill_phishing_urls/PhiUSIIL_Phishing_URL_Dataset.csv")
 }
+STATS_MANIFEST = "dataset_stats_manifest.json"
+CHUNK_SIZE = 100_000
+LABEL_COLUMNS = ["email_type", "label"]
+TEXT_COLUMNS = ["email_text", "url"]
+LENGTH_PERCENTILES = [50, 90, 99]
+# bumped when the computed stats change so cached manifest entries are recomputed
+STATS_VERSION = 2
 
 # prints dataset summary information for the given dataframe and dataset name
 def dataset_info_print(df, dataset_name):
@@ -20,8 +30,112 @@ def dataset_info_print(df, dataset_name):
     print("[INFO] duplicate rows:")
     print(df.duplicated().sum())
 
-# processes dataset files and prints dataset information
-def main():
+# loads the stats manifest that caches results per file
+def load_stats_manifest():
+    if not os.path.exists(STATS_MANIFEST):
+        return {}
+    try:
+        with open(STATS_MANIFEST, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"[ERROR] failed to read {STATS_MANIFEST} ({e}). ignoring cached stats.")
+        return {}
+
+# saves the stats manifest
+def save_stats_manifest(manifest):
+    with open(STATS_MANIFEST, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+# returns the size, modification time and stats version used to decide if cached stats are still valid
+def file_signature(file_path):
+    stat = os.stat(file_path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "version": STATS_VERSION}
+
+# returns the nearest-rank percentiles of text lengths from a histogram of exact lengths
+def length_percentiles(length_counts, total):
+    lengths = np.array(sorted(length_counts))
+    cumulative = np.cumsum([length_counts[length] for length in lengths])
+    return {
+        f"p{p}": int(lengths[np.searchsorted(cumulative, max(1, int(np.ceil(total * p / 100))))])
+        for p in LENGTH_PERCENTILES
+    }
+
+# computes row counts, label histograms, text length distribution and duplicate rows in one chunked pass
+def stream_dataset_stats(file_path, chunksize=CHUNK_SIZE):
+    rows = 0
+    duplicates = 0
+    seen_hashes = np.empty(0, dtype=np.uint64)
+    label_counts = {}
+    text_column = None
+    length_counts = Counter()
+    length_sum = 0
+    length_min = None
+    length_max = 0
+    for chunk in pd.read_csv(file_path, dtype=str, chunksize=chunksize):
+        rows += len(chunk)
+        row_hashes = pd.util.hash_pandas_object(chunk, index=False).to_numpy()
+        unique_hashes = np.unique(row_hashes)
+        duplicates += len(row_hashes) - len(unique_hashes)
+        duplicates += int(np.isin(unique_hashes, seen_hashes, assume_unique=True).sum())
+        seen_hashes = np.union1d(seen_hashes, unique_hashes)
+        for col in LABEL_COLUMNS:
+            if col in chunk.columns:
+                counts = label_counts.setdefault(col, Counter())
+                counts.update({str(k): int(v) for k, v in chunk[col].value_counts(dropna=False).items()})
+        if text_column is None:
+            text_column = next((c for c in TEXT_COLUMNS if c in chunk.columns), "")
+        if text_column:
+            lengths = chunk[text_column].fillna("").str.len().to_numpy()
+            if len(lengths):
+                length_sum += int(lengths.sum())
+                length_min = int(lengths.min()) if length_min is None else min(length_min, int(lengths.min()))
+                length_max = max(length_max, int(lengths.max()))
+                length_counts.update({int(k): int(v) for k, v in zip(*np.unique(lengths, return_counts=True))})
+    stats = {
+        "rows": rows,
+        "duplicate_rows": duplicates,
+        "label_counts": {col: dict(counts.most_common()) for col, counts in label_counts.items()}
+    }
+    if text_column and rows:
+        stats["text_length"] = {
+            "column": text_column,
+            "min": length_min,
+            "max": length_max,
+            "mean": length_sum / rows,
+            **length_percentiles(length_counts, rows)
+        }
+    return stats
+
+# returns cached stats for an unchanged file or streams the file and updates the manifest
+def get_dataset_stats(file_path, manifest, chunksize=CHUNK_SIZE):
+    key = os.path.abspath(file_path)
+    signature = file_signature(file_path)
+    cached = manifest.get(key)
+    if cached and cached.get("signature") == signature:
+        print(f"[INFO] using cached stats for {file_path}.")
+        return cached["stats"]
+    stats = stream_dataset_stats(file_path, chunksize)
+    manifest[key] = {"signature": signature, "stats": stats}
+    return stats
+
+# prints dataset summary information from streamed stats
+def print_dataset_stats(stats, dataset_name):
+    print(f"[INFO] === {dataset_name} dataset overview ===")
+    print(f"[INFO] total entries: {stats['rows']}")
+    titles = {"email_type": "email type distribution", "label": "url label distribution"}
+    for col, counts in stats["label_counts"].items():
+        print(f"[INFO] {titles.get(col, col)}:")
+        for value, count in counts.items():
+            print(f"  {value}: {count}")
+    if "text_length" in stats:
+        t = stats["text_length"]
+        percentiles = " ".join(f"{p} {t[p]}" for p in t if p.startswith("p"))
+        print(f"[INFO] {t['column']} length: min {t['min']} | mean {t['mean']:.1f} | max {t['max']} | {percentiles}")
+    print("[INFO] duplicate rows:")
+    print(stats["duplicate_rows"])
+
+# processes dataset files and prints dataset information, streaming in chunks unless streaming is disabled
+def main(streaming=True):
     print("[INFO] starting dataset information processing...")
     datasets = {
         "unified email dataset": "unified_email_dataset.csv",
@@ -29,17 +143,24 @@ def main():
         "unified url dataset": "unified_url_dataset.csv",
         "master url dataset": "master_url_dataset.csv"
     }
+    manifest = load_stats_manifest() if streaming else {}
     for dataset_name, file_path in datasets.items():
         if not os.path.exists(file_path):
             print(f"[ERROR] {dataset_name}: file not found -> {file_path}")
             continue
         try:
             print(f"[INFO] processing {dataset_name}...")
-            df = pd.read_csv(file_path, low_memory=False)
-            dataset_info_print(df, dataset_name)
+            if streaming:
+                stats = get_dataset_stats(file_path, manifest)
+                print_dataset_stats(stats, dataset_name)
+            else:
+                df = pd.read_csv(file_path, low_memory=False)
+                dataset_info_print(df, dataset_name)
             print(f"[SUCCESS] finished processing {dataset_name}.")
         except Exception as e:
             print(f"[ERROR] {dataset_name}: error reading {file_path} -> {e}")
+    if streaming:
+        save_stats_manifest(manifest)
     print("[INFO] finished dataset information processing.")
 
 if __name__ == "__main__":
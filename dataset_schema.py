@@ -0,0 +1,68 @@
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    TEXT_DTYPE = pd.StringDtype("pyarrow")
+except ImportError:
+    TEXT_DTYPE = pd.StringDtype("python")
+
+LABEL_DTYPE = "int8"
+INVALID_LABEL = -1
+EMAIL_COLUMNS = ["email_text", "email_type", "email_label"]
+URL_COLUMNS = ["url", "label"]
+
+# converts a label column to int8, mapping anything that is not a number to -1
+def to_label_dtype(series):
+    labels = pd.to_numeric(series, errors="coerce")
+    return labels.fillna(INVALID_LABEL).astype(LABEL_DTYPE)
+
+# converts an email dataframe to arrow-backed text, categorical email_type and int8 labels
+def compact_email_frame(df):
+    dtypes = {}
+    if "email_text" in df.columns:
+        dtypes["email_text"] = TEXT_DTYPE
+    if "email_type" in df.columns and not isinstance(df["email_type"].dtype, pd.CategoricalDtype):
+        dtypes["email_type"] = "category"
+    df = df.astype(dtypes)
+    if "email_label" in df.columns and df["email_label"].dtype != LABEL_DTYPE:
+        df["email_label"] = to_label_dtype(df["email_label"])
+    return df
+
+# converts a url dataframe to arrow-backed urls and int8 labels
+def compact_url_frame(df):
+    df = df.astype({"url": TEXT_DTYPE})
+    if df["label"].dtype != LABEL_DTYPE:
+        df["label"] = to_label_dtype(df["label"])
+    return df
+
+# concatenates email dataframes without falling back to object columns for text or email_type
+def concat_email_frames(frames):
+    frames = [compact_email_frame(f) for f in frames]
+    categories = pd.Index([])
+    for f in frames:
+        if "email_type" in f.columns:
+            categories = categories.union(f["email_type"].cat.categories)
+    frames = [
+        f.assign(email_type=f["email_type"].cat.set_categories(categories)) if "email_type" in f.columns else f
+        for f in frames
+    ]
+    return pd.concat(frames, ignore_index=True)
+
+# reads an email csv with only the email columns and compact dtypes
+def read_email_dataset(path, columns=EMAIL_COLUMNS, **kwargs):
+    dtypes = {"email_text": TEXT_DTYPE, "email_type": "category", "email_label": TEXT_DTYPE}
+    if kwargs.get("header", "infer") is None:
+        df = pd.read_csv(path, dtype=dtypes, names=columns, usecols=range(len(columns)), **kwargs)
+    else:
+        df = pd.read_csv(path, dtype=dtypes, usecols=lambda c: c in columns, **kwargs)
+    return compact_email_frame(df)
+
+# reads a url csv with only the url and label columns and compact dtypes
+def read_url_dataset(path, **kwargs):
+    dtypes = {"url": TEXT_DTYPE, "label": TEXT_DTYPE}
+    if kwargs.get("header", "infer") is None:
+        df = pd.read_csv(path, dtype=dtypes, names=URL_COLUMNS, usecols=range(len(URL_COLUMNS)), **kwargs)
+    else:
+        df = pd.read_csv(path, dtype=dtypes, usecols=lambda c: c.lower() in URL_COLUMNS, **kwargs)
+        df.columns = [col.lower() for col in df.columns]
+    return compact_url_frame(df)
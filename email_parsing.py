@@ -0,0 +1,55 @@
+import re
+import html
+from email import policy
+from email.header import decode_header, make_header
+from email.parser import BytesParser
+
+# strips scripts, styles and tags from html and unescapes entities
+def html_to_text(markup):
+    markup = re.sub(r"(?is)<(script|style)\b.*?</\1\s*>", " ", markup)
+    markup = re.sub(r"(?s)<[^>]+>", " ", markup)
+    return re.sub(r"\s+", " ", html.unescape(markup)).strip()
+
+# returns the decoded text of a single message part, ignoring undecodable bytes
+def part_text(part):
+    payload = part.get_payload(decode=True)
+    if payload is None:
+        return ""
+    charset = part.get_content_charset() or "utf-8"
+    try:
+        return payload.decode(charset, errors="ignore")
+    except LookupError:
+        return payload.decode("utf-8", errors="ignore")
+
+# returns the decoded subject header of a message, or an empty string
+def message_subject(message):
+    subject = message["subject"]
+    if not subject:
+        return ""
+    try:
+        return str(make_header(decode_header(str(subject))))
+    except Exception:
+        return str(subject)
+
+# returns the body of a message from its text/plain parts, falling back to stripped text/html parts
+def message_body(message):
+    plain = []
+    markup = []
+    for part in message.walk():
+        if part.is_multipart() or part.get_content_disposition() == "attachment":
+            continue
+        content_type = part.get_content_type()
+        if content_type == "text/plain":
+            plain.append(part_text(part))
+        elif content_type == "text/html":
+            markup.append(html_to_text(part_text(part)))
+    parts = plain if any(p.strip() for p in plain) else markup
+    return "\n".join(p.strip() for p in parts if p.strip())
+
+# returns subject and body joined the same way the training datasets store them
+def message_text(message):
+    return f"{message_subject(message)} {message_body(message)}".strip()
+
+# parses raw message bytes into a message object
+def parse_message(raw):
+    return BytesParser(policy=policy.compat32).parsebytes(raw)
@@ -0,0 +1,261 @@
+import os
+import argparse
+import json
+import pickle
+import time
+import hashlib
+import numpy as np
+import scipy.sparse as sp
+from concurrent.futures import ProcessPoolExecutor
+from sklearn.feature_extraction.text import TfidfVectorizer, CountVectorizer
+from sklearn.model_selection import StratifiedKFold
+from sklearn.naive_bayes import MultinomialNB
+from sklearn.metrics import accuracy_score, confusion_matrix, precision_recall_fscore_support
+from train_email_classifier import load_data, compute_sample_weights, vectorizer_params
+from model_loader import combine_probabilities
+from feature_cache import evict_features
+
+CACHE_DIR = "data/evaluation_cache"
+CACHE_MAX_BYTES = 2 * 1024 ** 3
+REPORT_PATH = "evaluation_report.json"
+BUDGET_REPORT_PATH = "budget_report.json"
+BUDGETS = [None, 200_000, 50_000, 10_000]
+TRANSFORM_SAMPLE_SIZE = 1000
+N_SPLITS = 5
+N_WORKERS = min(N_SPLITS, os.cpu_count() or 1)
+RANDOM_STATE = 42
+LABELS = [0, 1, 2]
+LABEL_NAMES = ["safe email", "spam email", "phishing email"]
+VECTORIZERS = {
+    "tfidf": TfidfVectorizer,
+    "bow": CountVectorizer
+}
+
+_texts = None
+_labels = None
+
+# stores the corpus once per worker process so folds only receive their index arrays
+def _init_worker(texts, labels):
+    global _texts, _labels
+    _texts = texts
+    _labels = labels
+
+# returns a hash of the corpus, labels, split and vectorizer settings used to key the feature matrix cache
+def dataset_key(texts, labels, n_splits, random_state, params=None):
+    digest = hashlib.sha256()
+    for text, label in zip(texts, labels):
+        digest.update(text.encode("utf-8", errors="ignore"))
+        digest.update(f"\0{label}\n".encode())
+    digest.update(f"{n_splits}:{random_state}".encode())
+    if params:
+        digest.update(json.dumps(params, sort_keys=True, default=str).encode())
+    return digest.hexdigest()[:16]
+
+# loads the cached train/test matrices for a fold or vectorizes the fold once and caches them
+def load_fold_matrices(cache_dir, fold, kind, train_idx, test_idx, params=None):
+    train_path = os.path.join(cache_dir, f"fold_{fold}_{kind}_train.npz")
+    test_path = os.path.join(cache_dir, f"fold_{fold}_{kind}_test.npz")
+    if os.path.exists(train_path) and os.path.exists(test_path):
+        return sp.load_npz(train_path), sp.load_npz(test_path), 0.0, True
+    start = time.perf_counter()
+    vectorizer = VECTORIZERS[kind](**(params or {}))
+    X_train = vectorizer.fit_transform([_texts[i] for i in train_idx])
+    X_test = vectorizer.transform([_texts[i] for i in test_idx])
+    elapsed = time.perf_counter() - start
+    sp.save_npz(train_path, X_train.tocsr())
+    sp.save_npz(test_path, X_test.tocsr())
+    return X_train, X_test, elapsed, False
+
+# trains and scores both models on a single fold and returns probabilities and timings
+def evaluate_fold(fold, train_idx, test_idx, cache_dir, params=None):
+    y_train = _labels[train_idx]
+    sample_weight = compute_sample_weights(y_train)
+    probs = {}
+    timings = {}
+    for kind in VECTORIZERS:
+        X_train, X_test, vectorize_time, cached = load_fold_matrices(cache_dir, fold, kind, train_idx, test_idx, params)
+        model = MultinomialNB()
+        start = time.perf_counter()
+        model.fit(X_train, y_train, sample_weight=sample_weight)
+        fit_time = time.perf_counter() - start
+        start = time.perf_counter()
+        probs[kind] = model.predict_proba(X_test)
+        score_time = time.perf_counter() - start
+        timings[kind] = {
+            "cached": cached,
+            "vectorize_seconds": vectorize_time,
+            "fit_seconds": fit_time,
+            "score_seconds": score_time,
+            "train_rows": len(train_idx),
+            "test_rows": len(test_idx)
+        }
+    probs["ensemble"] = combine_probabilities(probs["tfidf"], probs["bow"])
+    print(f"[SUCCESS] finished evaluating fold {fold}.")
+    return fold, test_idx, probs, timings
+
+# computes per-class precision, recall, f1 and the confusion matrix for one set of predictions
+def score_predictions(y_true, y_pred):
+    precision, recall, f1, support = precision_recall_fscore_support(
+        y_true, y_pred, labels=LABELS, zero_division=0
+    )
+    per_class = {
+        name: {"precision": float(p), "recall": float(r), "f1": float(f), "support": int(s)}
+        for name, p, r, f, s in zip(LABEL_NAMES, precision, recall, f1, support)
+    }
+    return {
+        "accuracy": float(accuracy_score(y_true, y_pred)),
+        "macro_f1": float(np.mean(f1)),
+        "per_class": per_class,
+        "confusion_matrix": confusion_matrix(y_true, y_pred, labels=LABELS).tolist()
+    }
+
+# sums fold timings per model and converts them to rows per second
+def summarize_throughput(fold_timings):
+    summary = {}
+    for kind in VECTORIZERS:
+        timings = [t[kind] for t in fold_timings]
+        train_rows = sum(t["train_rows"] for t in timings)
+        test_rows = sum(t["test_rows"] for t in timings)
+        fit_seconds = sum(t["fit_seconds"] for t in timings)
+        score_seconds = sum(t["score_seconds"] for t in timings)
+        summary[kind] = {
+            "vectorize_seconds": sum(t["vectorize_seconds"] for t in timings),
+            "folds_from_cache": sum(1 for t in timings if t["cached"]),
+            "fit_seconds": fit_seconds,
+            "score_seconds": score_seconds,
+            "train_rows_per_second": train_rows / fit_seconds if fit_seconds else 0.0,
+            "score_rows_per_second": test_rows / score_seconds if score_seconds else 0.0
+        }
+    return summary
+
+# prints the per-model scores and throughput of an evaluation report
+def print_report(report):
+    print(f"[INFO] === evaluation over {report['n_splits']} folds ({report['rows']} emails) ===")
+    for model_name, scores in report["models"].items():
+        print(f"[INFO] {model_name}: accuracy {scores['accuracy']:.4f} | macro f1 {scores['macro_f1']:.4f}")
+        for label_name, s in scores["per_class"].items():
+            print(f"         {label_name:<15} precision {s['precision']:.4f} recall {s['recall']:.4f} "
+                  f"f1 {s['f1']:.4f} support {s['support']}")
+        print(f"         confusion matrix: {scores['confusion_matrix']}")
+    for kind, t in report["throughput"].items():
+        print(f"[INFO] {kind} throughput: train {t['train_rows_per_second']:.0f} rows/s | "
+              f"score {t['score_rows_per_second']:.0f} rows/s | vectorize {t['vectorize_seconds']:.2f}s "
+              f"({t['folds_from_cache']} folds from cache)")
+
+# runs k-fold cross validation of the tf-idf, bow and ensemble models in parallel worker processes;
+# max_features or memory_budget_mb evaluate the pruned float32 vocabulary used by budgeted training
+def evaluate(n_splits=N_SPLITS, n_workers=N_WORKERS, random_state=RANDOM_STATE, max_features=None,
+             memory_budget_mb=None, report_path=REPORT_PATH, df=None):
+    print("[INFO] starting email classifier evaluation...")
+    df = load_data() if df is None else df
+    if df is None or df.empty:
+        print("[ERROR] dataset is empty. skipping evaluation.")
+        return None
+    texts = df["email_text"].tolist()
+    labels = df["email_label"].to_numpy()
+    params = vectorizer_params(max_features, memory_budget_mb)
+    key = dataset_key(texts, labels, n_splits, random_state, params)
+    cache_dir = os.path.join(CACHE_DIR, key)
+    os.makedirs(cache_dir, exist_ok=True)
+    os.utime(cache_dir)
+    print(f"[INFO] using feature matrix cache -> {cache_dir}")
+    splitter = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=random_state)
+    splits = list(splitter.split(np.zeros(len(labels)), labels))
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker, initargs=(texts, labels)) as pool:
+        futures = [
+            pool.submit(evaluate_fold, fold, train_idx, test_idx, cache_dir, params)
+            for fold, (train_idx, test_idx) in enumerate(splits)
+        ]
+        results = sorted((f.result() for f in futures), key=lambda r: r[0])
+    wall_time = time.perf_counter() - start
+    evict_features(keep=key, max_bytes=CACHE_MAX_BYTES, cache_dir=CACHE_DIR)
+    predictions = {name: np.empty(len(labels), dtype=int) for name in ["tfidf", "bow", "ensemble"]}
+    for _, test_idx, probs, _ in results:
+        for name, prob in probs.items():
+            predictions[name][test_idx] = np.argmax(prob, axis=1)
+    report = {
+        "rows": len(labels),
+        "n_splits": n_splits,
+        "n_workers": n_workers,
+        "wall_seconds": wall_time,
+        "max_features": params.get("max_features"),
+        "models": {name: score_predictions(labels, pred) for name, pred in predictions.items()},
+        "throughput": summarize_throughput([r[3] for r in results])
+    }
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print_report(report)
+    print(f"[SUCCESS] finished email classifier evaluation in {wall_time:.2f} seconds. saved -> {report_path}")
+    return report
+
+# fits both vectorizers on the full corpus and returns vocabulary size, pickled size and per-email transform time
+def measure_vectorizers(texts, params):
+    sample = texts[:TRANSFORM_SAMPLE_SIZE]
+    vocabulary_size = 0
+    total_bytes = 0
+    transform_seconds = 0.0
+    for kind, vectorizer_class in VECTORIZERS.items():
+        vectorizer = vectorizer_class(**params).fit(texts)
+        if hasattr(vectorizer, "stop_words_"):
+            del vectorizer.stop_words_
+        vocabulary_size = len(vectorizer.vocabulary_)
+        total_bytes += len(pickle.dumps(vectorizer, protocol=pickle.HIGHEST_PROTOCOL))
+        start = time.perf_counter()
+        for text in sample:
+            vectorizer.transform([text])
+        transform_seconds += time.perf_counter() - start
+    return {
+        "vocabulary_size": vocabulary_size,
+        "vectorizer_bytes": total_bytes,
+        "transform_ms_per_email": transform_seconds / len(sample) * 1000 if sample else 0.0
+    }
+
+# evaluates each feature budget and reports the accuracy against vectorizer size and transform cost
+def compare_budgets(budgets=BUDGETS, n_splits=N_SPLITS, n_workers=N_WORKERS, random_state=RANDOM_STATE):
+    print("[INFO] starting feature budget comparison...")
+    df = load_data()
+    if df is None or df.empty:
+        print("[ERROR] dataset is empty. skipping budget comparison.")
+        return None
+    texts = df["email_text"].tolist()
+    rows = []
+    for budget in budgets:
+        name = "unbudgeted" if budget is None else f"{budget} features"
+        report = evaluate(n_splits, n_workers, random_state, max_features=budget,
+                          report_path=os.devnull, df=df)
+        ensemble = report["models"]["ensemble"]
+        row = {
+            "budget": name,
+            "accuracy": ensemble["accuracy"],
+            "macro_f1": ensemble["macro_f1"],
+            **measure_vectorizers(texts, vectorizer_params(budget))
+        }
+        rows.append(row)
+        print(f"[INFO] {name}: macro f1 {row['macro_f1']:.4f} | accuracy {row['accuracy']:.4f} | "
+              f"vocabulary {row['vocabulary_size']} | vectorizers {row['vectorizer_bytes'] / 1024 ** 2:.1f} MB | "
+              f"transform {row['transform_ms_per_email']:.3f} ms/email")
+    with open(BUDGET_REPORT_PATH, "w", encoding="utf-8") as f:
+        json.dump(rows, f, indent=2)
+    print(f"[SUCCESS] finished feature budget comparison. saved -> {BUDGET_REPORT_PATH}")
+    return rows
+
+# parses command line arguments and runs the evaluation or the feature budget comparison
+def main():
+    parser = argparse.ArgumentParser(description="Cross-validate the email classifiers.")
+    parser.add_argument("--splits", type=int, default=N_SPLITS)
+    parser.add_argument("--workers", type=int, default=N_WORKERS)
+    parser.add_argument("--max-features", type=int, help="evaluate with a capped, pruned float32 vocabulary")
+    parser.add_argument("--memory-budget-mb", type=float, help="derive the vocabulary cap from an estimated memory budget")
+    parser.add_argument("--compare-budgets", type=int, nargs="*", metavar="FEATURES",
+                        help="compare accuracy against size for these feature budgets and an unbudgeted baseline "
+                             f"(default: {BUDGETS[1:]})")
+    args = parser.parse_args()
+    if args.compare_budgets is not None:
+        budgets = [None] + args.compare_budgets if args.compare_budgets else BUDGETS
+        compare_budgets(budgets, args.splits, args.workers)
+    else:
+        evaluate(args.splits, args.workers, max_features=args.max_features, memory_budget_mb=args.memory_budget_mb)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import os
+import json
+import shutil
+import hashlib
+import joblib
+import numpy as np
+import scipy.sparse as sp
+
+FEATURE_CACHE_DIR = "data/feature_cache"
+FEATURE_CACHE_MAX_BYTES = 2 * 1024 ** 3
+HASH_BLOCK_SIZE = 1024 * 1024
+
+# returns the sha256 of a file's contents, or a marker when the file does not exist
+def file_digest(path):
+    if not os.path.exists(path):
+        return "missing"
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+# returns a cache key from the contents of the input files and a json-serializable config
+def feature_cache_key(paths, config):
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(f"{path}:{file_digest(path)}\n".encode())
+    digest.update(json.dumps(config, sort_keys=True, default=str).encode())
+    return digest.hexdigest()[:24]
+
+# returns the total size in bytes of all files under a directory
+def directory_size(path):
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, files_list in os.walk(path)
+        for name in files_list
+    )
+
+# loads the cached vectorizers, feature matrices, labels and url risk for a key, or None on a miss
+def load_features(key):
+    entry = os.path.join(FEATURE_CACHE_DIR, key)
+    if not os.path.exists(os.path.join(entry, "complete")):
+        return None
+    try:
+        features = (
+            joblib.load(os.path.join(entry, "tfidf_vectorizer.pkl")),
+            sp.load_npz(os.path.join(entry, "X_tfidf.npz")),
+            joblib.load(os.path.join(entry, "bow_vectorizer.pkl")),
+            sp.load_npz(os.path.join(entry, "X_bow.npz"))
+        )
+        labels = np.load(os.path.join(entry, "labels.npy"))
+        url_risk = np.load(os.path.join(entry, "url_risk.npy"))
+    except Exception as e:
+        print(f"[ERROR] failed to load feature cache entry {key} ({e}). rebuilding.")
+        return None
+    os.utime(entry)
+    return features, labels, url_risk
+
+# saves vectorizers, feature matrices, labels and url risk under a key and evicts old entries over the size limit
+def save_features(key, features, labels, url_risk):
+    tfidf_vectorizer, X_tfidf, bow_vectorizer, X_bow = features
+    entry = os.path.join(FEATURE_CACHE_DIR, key)
+    shutil.rmtree(entry, ignore_errors=True)
+    os.makedirs(entry)
+    joblib.dump(tfidf_vectorizer, os.path.join(entry, "tfidf_vectorizer.pkl"))
+    joblib.dump(bow_vectorizer, os.path.join(entry, "bow_vectorizer.pkl"))
+    sp.save_npz(os.path.join(entry, "X_tfidf.npz"), X_tfidf.tocsr())
+    sp.save_npz(os.path.join(entry, "X_bow.npz"), X_bow.tocsr())
+    np.save(os.path.join(entry, "labels.npy"), np.asarray(labels))
+    np.save(os.path.join(entry, "url_risk.npy"), np.asarray(url_risk))
+    open(os.path.join(entry, "complete"), "w").close()
+    evict_features(keep=key)
+
+# removes the least recently used entries of a cache directory until it fits in max_bytes
+def evict_features(keep=None, max_bytes=FEATURE_CACHE_MAX_BYTES, cache_dir=FEATURE_CACHE_DIR):
+    if not os.path.exists(cache_dir):
+        return
+    entries = []
+    for name in os.listdir(cache_dir):
+        path = os.path.join(cache_dir, name)
+        if os.path.isdir(path):
+            entries.append((os.path.getmtime(path), name, directory_size(path)))
+    total = sum(size for _, _, size in entries)
+    for _, name, size in sorted(entries):
+        if total <= max_bytes:
+            break
+        if name == keep:
+            continue
+        shutil.rmtree(os.path.join(cache_dir, name), ignore_errors=True)
+        total -= size
+        print(f"[INFO] evicted cache entry {cache_dir}/{name}.")
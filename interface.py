@@ -1,16 +1,50 @@
+import time
+RUN_START = time.perf_counter()
 import streamlit as st
-import pandas as pd
 import os
 import subprocess
-import time
 import csv
-from model_loader import predict_email
-from url_utils import extract_urls, check_urls
+import threading
 
-import pandas as pd
-import os
-import subprocess
-import csv
+# imports the classifier modules and loads the models, master url dataset and phishing blocklist,
+# recording how long each step took, then marks the app as ready
+def warm_up(state):
+    print("[INFO] starting warm-up...")
+    start = time.perf_counter()
+    step = start
+    try:
+        import model_loader
+        import url_utils
+        state["timings"]["imports"] = time.perf_counter() - step
+        step = time.perf_counter()
+        model_loader.get_models()
+        state["timings"]["models"] = time.perf_counter() - step
+        step = time.perf_counter()
+        url_utils.load_master_url_dataset()
+        state["timings"]["master url dataset"] = time.perf_counter() - step
+        step = time.perf_counter()
+        url_utils.get_phishing_urls()
+        state["timings"]["phishing blocklist"] = time.perf_counter() - step
+    except Exception as e:
+        state["error"] = str(e)
+        print(f"[ERROR] warm-up failed: {e}")
+    state["timings"]["total"] = time.perf_counter() - start
+    state["ready"].set()
+    steps = " | ".join(f"{name} {seconds:.2f}s" for name, seconds in state["timings"].items() if name != "total")
+    print(f"[SUCCESS] finished warm-up in {state['timings']['total']:.2f} seconds ({steps}).")
+
+# starts the warm-up thread once per server process and returns its shared state
+@st.cache_resource
+def start_warm_up():
+    state = {
+        "ready": threading.Event(),
+        "error": None,
+        "timings": {},
+        "first_paint": None,
+        "first_verdict": None
+    }
+    threading.Thread(target=warm_up, args=(state,), daemon=True).start()
+    return state
 
 def store_user_provided_email(email_text, label):
     label_map = {"Safe Email": 0, "Spam Email": 1, "Phishing Email": 2}
@@ -101,6 +135,7 @@ def retrain_model():
 
 def main():
     st.set_page_config(page_title="Email Classifier",layout="centered")
+    warm_up_state=start_warm_up()
     st.markdown(
         """
         <style>
@@ -144,16 +179,26 @@ def main():
         </div>
         """,unsafe_allow_html=True)
     st.markdown("<h2 class='gold-text'>Email Classifier</h2>",unsafe_allow_html=True)
+    if warm_up_state["error"]:
+        st.caption(f"Model loading failed: {warm_up_state['error']}")
+    elif warm_up_state["ready"].is_set():
+        st.caption(f"Models ready (loaded in {warm_up_state['timings']['total']:.1f}s).")
+    else:
+        st.caption("Loading models in the background...")
     if "predicted" not in st.session_state:
         st.session_state.predicted=False
         st.session_state.user_email=""
     st.session_state.user_email=st.text_area("Enter an email text to classify:",height=200,value=st.session_state.user_email,key="user_email_input",disabled=st.session_state.predicted)
     if not st.session_state.predicted:
         if st.button("Classify Email"):
+            clicked=time.perf_counter()
             if not st.session_state.user_email.strip():
                 st.error("Please enter some email text first.")
                 return
             with st.spinner("Classification in-progress..."):
+                warm_up_state["ready"].wait()
+                from model_loader import predict_email
+                from url_utils import extract_urls, check_urls
                 urls=extract_urls(st.session_state.user_email)
                 risk_value, risk_source=check_urls(urls) if urls else (0,"none")
                 predicted_label,final_prob,warning_message=predict_email(st.session_state.user_email)
@@ -165,6 +210,10 @@ def main():
                 else:
                     label_map={"safe email":"Safe Email","spam email":"Spam Email","phishing email":"Phishing Email"}
                     predicted_label=label_map.get(predicted_label.lower(),"Unknown")
+            if warm_up_state["first_verdict"] is None:
+                warm_up_state["first_verdict"]=time.perf_counter()-clicked
+                print(f"[INFO] time from click to first verdict: {warm_up_state['first_verdict']:.2f} seconds "
+                      f"(warm-up total {warm_up_state['timings']['total']:.2f} seconds).")
             st.session_state.update({"predicted":True,"predicted_label":predicted_label,"final_prob":final_prob,"warning_message":warning_message,"urls":urls,"risk_value":risk_value,"risk_source":risk_source})
     if st.session_state.predicted:
         st.markdown("<h2 class='gold-text'>Probability Scores</h2>",unsafe_allow_html=True)
@@ -196,6 +245,9 @@ def main():
                 st.rerun()
 
     st.markdown("</div>",unsafe_allow_html=True)
+    if warm_up_state["first_paint"] is None:
+        warm_up_state["first_paint"]=time.perf_counter()-RUN_START
+        print(f"[INFO] time to first paint: {warm_up_state['first_paint']:.2f} seconds.")
 
 if __name__=="__main__":
     main()
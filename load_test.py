@@ -0,0 +1,212 @@
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import tempfile
+import argparse
+import subprocess
+import contextlib
+import urllib.request
+from types import SimpleNamespace
+from unittest import mock
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from create_unified_email_dataset import files as EMAIL_SOURCES, load_csv
+from create_master_email_dataset import unify_columns, TEXT_SOURCE_COLUMNS
+
+CONCURRENCY = 4
+DURATION = 60
+INTERVAL = 10
+SAMPLE_SIZE = 2000
+GIT_LATENCY = 0.2
+HTTP_TIMEOUT = 30
+REPORT_PATH = "load_test_report.json"
+WORKDIR_FILES = [
+    "naive_bayes_tfidf_model.pkl",
+    "naive_bayes_bow_model.pkl",
+    "tfidf_vectorizer.pkl",
+    "bow_vectorizer.pkl",
+    "master_url_dataset.csv",
+    "user_provided_urls.csv",
+    "user_provided_emails.csv",
+    "data/external_phishing_checker/phishing_urls.txt"
+]
+
+# loads an evenly mixed random sample of email texts from the bundled csv datasets
+def load_email_mix(sample_size=SAMPLE_SIZE, seed=0):
+    sources = {name: path for name, path in EMAIL_SOURCES.items() if path.endswith(".csv") and os.path.exists(path)}
+    if not sources:
+        return []
+    per_source = max(1, sample_size // len(sources))
+    texts = []
+    for name, path in sources.items():
+        df = unify_columns(load_csv(name, path), TEXT_SOURCE_COLUMNS, "email_text")
+        if "email_text" not in df.columns:
+            continue
+        column = df["email_text"].dropna().astype(str)
+        column = column[column.str.strip() != ""]
+        texts.extend(column.sample(min(per_source, len(column)), random_state=seed).tolist())
+    random.Random(seed).shuffle(texts)
+    return texts
+
+# stands in for git commands: waits like a push would and reports staged changes so commit and push run
+def fake_subprocess_run(args, *_, **__):
+    time.sleep(GIT_LATENCY)
+    returncode = 1 if "diff" in args else 0
+    return subprocess.CompletedProcess(args, returncode)
+
+# stands in for downloads of the phishing database, returning an empty list
+def fake_requests_get(url, *_, **__):
+    return SimpleNamespace(text="", status_code=200, raise_for_status=lambda: None)
+
+# copies the models and url databases into a scratch directory so appends and downloads never touch the repo
+@contextlib.contextmanager
+def isolated_workdir():
+    origin = os.getcwd()
+    workdir = tempfile.mkdtemp(prefix="load_test_")
+    for path in WORKDIR_FILES:
+        if os.path.exists(path):
+            os.makedirs(os.path.join(workdir, os.path.dirname(path)), exist_ok=True)
+            shutil.copy2(path, os.path.join(workdir, path))
+    os.chdir(workdir)
+    try:
+        yield workdir
+    finally:
+        os.chdir(origin)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+# returns a request function that runs the same classification steps as interface.main for one email
+def python_target(feedback_rate=0.0):
+    from model_loader import predict_email
+    from url_utils import extract_urls, check_urls
+    store_user_provided_email = None
+    if feedback_rate > 0:
+        from interface import store_user_provided_email
+
+    def classify(text, rng):
+        urls = extract_urls(text)
+        risk_value, _ = check_urls(urls) if urls else (0, "none")
+        predicted_label, final_prob, _ = predict_email(text)
+        if predicted_label is None:
+            raise RuntimeError("failed to load models.")
+        if store_user_provided_email and rng.random() < feedback_rate:
+            store_user_provided_email(text, "phishing email" if risk_value == 2 else predicted_label)
+    return classify
+
+# returns a request function that posts each email as json to an http endpoint
+def http_target(url, timeout=HTTP_TIMEOUT):
+    def classify(text, rng):
+        request = urllib.request.Request(
+            url,
+            data=json.dumps({"email_text": text}).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST"
+        )
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+    return classify
+
+# returns request count, throughput, latency percentiles and error rate for a list of (end, latency, ok) results
+def summarize(results, seconds):
+    latencies = np.array([latency for _, latency, _ in results]) * 1000
+    errors = sum(1 for _, _, ok in results if not ok)
+    summary = {
+        "requests": len(results),
+        "throughput": len(results) / seconds if seconds else 0.0,
+        "error_rate": errors / len(results) if results else 0.0
+    }
+    for p in (50, 95, 99):
+        summary[f"p{p}_ms"] = float(np.percentile(latencies, p)) if len(latencies) else 0.0
+    return summary
+
+# prints one line of load test statistics
+def print_summary(label, summary, out):
+    print(f"[INFO] {label}: {summary['requests']} requests | {summary['throughput']:.2f} req/s | "
+          f"p50 {summary['p50_ms']:.0f} ms | p95 {summary['p95_ms']:.0f} ms | p99 {summary['p99_ms']:.0f} ms | "
+          f"errors {summary['error_rate']:.1%}", file=out)
+
+# runs concurrent simulated users against a target and reports statistics per interval and overall
+def run_load_test(target, texts, concurrency=CONCURRENCY, duration=DURATION, interval=INTERVAL, out=sys.stdout):
+    results = []
+    errors = {}
+    start = time.monotonic()
+    stop = start + duration
+
+    # sends requests back to back with a random email each time until the test ends
+    def user(user_id):
+        rng = random.Random(user_id)
+        while time.monotonic() < stop:
+            text = rng.choice(texts)
+            request_start = time.perf_counter()
+            ok = True
+            try:
+                target(text, rng)
+            except Exception as e:
+                ok = False
+                errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+            results.append((time.monotonic(), time.perf_counter() - request_start, ok))
+
+    intervals = []
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [pool.submit(user, i) for i in range(concurrency)]
+        window_start = start
+        finished = False
+        while not finished:
+            # the last window runs to the deadline rather than leaving a sliver shorter than half an interval
+            remaining = stop - time.monotonic()
+            time.sleep(max(0.0, remaining if remaining < 1.5 * interval else interval))
+            now = time.monotonic()
+            finished = now >= stop
+            if finished:
+                # the requests still running at the deadline are folded into the last window
+                for f in futures:
+                    f.result()
+                now = time.monotonic()
+            window = [r for r in results if window_start <= r[0] <= now]
+            summary = summarize(window, now - window_start)
+            summary["elapsed_seconds"] = now - start
+            intervals.append(summary)
+            print_summary(f"t+{now - start:.0f}s", summary, out)
+            window_start = now
+    total = summarize(results, time.monotonic() - start)
+    return {"concurrency": concurrency, "duration_seconds": duration, "overall": total, "intervals": intervals,
+            "errors": errors}
+
+# parses command line arguments and runs the load test against the python api or an http endpoint
+def main():
+    parser = argparse.ArgumentParser(description="Load test the email classification entry points.")
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY, help="number of simultaneous users")
+    parser.add_argument("--duration", type=float, default=DURATION, help="test length in seconds")
+    parser.add_argument("--interval", type=float, default=INTERVAL, help="seconds between progress reports")
+    parser.add_argument("--sample-size", type=int, default=SAMPLE_SIZE, help="emails drawn from the bundled datasets")
+    parser.add_argument("--http-url", help="post emails to this local endpoint instead of calling the python api")
+    parser.add_argument("--feedback-rate", type=float, default=0.0,
+                        help="fraction of requests that also store the email as user feedback")
+    args = parser.parse_args()
+    print("[INFO] starting load test...")
+    texts = load_email_mix(args.sample_size)
+    if not texts:
+        print("[ERROR] no emails found in the bundled datasets. cannot run load test.")
+        return
+    print(f"[INFO] loaded {len(texts)} emails. running {args.concurrency} users for {args.duration:.0f} seconds...")
+    out = sys.stdout
+    target_name = args.http_url or "python api"
+    with isolated_workdir(), \
+            mock.patch("subprocess.run", fake_subprocess_run), \
+            mock.patch("requests.get", fake_requests_get), \
+            open(os.devnull, "w") as devnull, \
+            contextlib.redirect_stdout(devnull):
+        target = http_target(args.http_url) if args.http_url else python_target(args.feedback_rate)
+        report = run_load_test(target, texts, args.concurrency, args.duration, args.interval, out)
+    report["target"] = target_name
+    with open(REPORT_PATH, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print_summary(f"overall ({target_name})", report["overall"], out)
+    if report["errors"]:
+        print(f"[ERROR] errors by type: {report['errors']}")
+    print(f"[SUCCESS] finished load test. saved -> {REPORT_PATH}")
+
+if __name__ == "__main__":
+    main()
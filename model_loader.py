@@ -1,31 +1,66 @@
+import os
+import threading
 import joblib
 import numpy as np
 from url_utils import extract_urls, check_urls
 
+MODEL_TFIDF = "naive_bayes_tfidf_model.pkl"
+MODEL_BOW = "naive_bayes_bow_model.pkl"
+VECTORIZER_TFIDF = "tfidf_vectorizer.pkl"
+VECTORIZER_BOW = "bow_vectorizer.pkl"
+LABEL_MAPPING = {0: "safe email", 1: "spam email", 2: "phishing email"}
+models_cache = None
+models_signature = None
+models_lock = threading.Lock()
+
+# loads the trained models and vectorizers and returns them as one bundle
+def load_models():
+    nb_tfidf = joblib.load(MODEL_TFIDF)
+    tfidf_vectorizer = joblib.load(VECTORIZER_TFIDF)
+    nb_bow = joblib.load(MODEL_BOW)
+    bow_vectorizer = joblib.load(VECTORIZER_BOW)
+    return nb_tfidf, tfidf_vectorizer, nb_bow, bow_vectorizer
+
+# pads two-class probabilities to three classes and averages the tf-idf and bow model outputs
+def combine_probabilities(prob_tfidf, prob_bow):
+    probs = []
+    for prob in (prob_tfidf, prob_bow):
+        prob = np.asarray(prob, dtype=float)
+        if prob.shape[-1] == 2:
+            prob = np.pad(prob, [(0, 0)] * (prob.ndim - 1) + [(0, 1)])
+        probs.append(prob)
+    return (probs[0] + probs[1]) / 2
+
+# returns the model bundle, loading it once and again only when a model file has been rewritten
+def get_models():
+    global models_cache, models_signature
+    signature = tuple(os.path.getmtime(p) for p in (MODEL_TFIDF, VECTORIZER_TFIDF, MODEL_BOW, VECTORIZER_BOW))
+    with models_lock:
+        if models_cache is None or signature != models_signature:
+            models_cache = load_models()
+            models_signature = signature
+        return models_cache
+
+# returns the averaged model probabilities for a batch of email texts
+def predict_probabilities(texts, models):
+    nb_tfidf, tfidf_vectorizer, nb_bow, bow_vectorizer = models
+    prob_tfidf = nb_tfidf.predict_proba(tfidf_vectorizer.transform(texts))
+    prob_bow = nb_bow.predict_proba(bow_vectorizer.transform(texts))
+    return combine_probabilities(prob_tfidf, prob_bow)
+
 # predicts the classification of an email based on text content and url risk
-def predict_email(email_text):
+def predict_email(email_text, models=None):
     print("[INFO] starting email classification...")
-    try:
-        nb_tfidf = joblib.load("naive_bayes_tfidf_model.pkl")
-        tfidf_vectorizer = joblib.load("tfidf_vectorizer.pkl")
-        nb_bow = joblib.load("naive_bayes_bow_model.pkl")
-        bow_vectorizer = joblib.load("bow_vectorizer.pkl")
-    except Exception as e:
-        print(f"[ERROR] failed to load model files: {e}")
-        return None, None, "failed to load models."
+    if models is None:
+        try:
+            models = get_models()
+        except Exception as e:
+            print(f"[ERROR] failed to load model files: {e}")
+            return None, None, "failed to load models."
     urls = extract_urls(email_text)
-    url_risk = check_urls(urls) if urls else 0
-    email_tfidf = tfidf_vectorizer.transform([email_text])
-    email_bow = bow_vectorizer.transform([email_text])
-    prob_tfidf = nb_tfidf.predict_proba(email_tfidf)[0]
-    prob_bow = nb_bow.predict_proba(email_bow)[0]
-    if len(prob_tfidf) == 2:
-        prob_tfidf = np.append(prob_tfidf, [0])
-    if len(prob_bow) == 2:
-        prob_bow = np.append(prob_bow, [0])
-    final_prob = (prob_tfidf + prob_bow) / 2
-    label_mapping = {0: "safe email", 1: "spam email", 2: "phishing email"}
-    predicted_label = label_mapping[np.argmax(final_prob)]
+    url_risk, _ = check_urls(urls) if urls else (0, "none")
+    final_prob = predict_probabilities([email_text], models)[0]
+    predicted_label = LABEL_MAPPING[np.argmax(final_prob)]
     warning_message = ""
     if url_risk == 2:
         predicted_label = "phishing email"
@@ -1,8 +1,10 @@
 import mailbox
-import pandas as pd
+import csv
 import os
 import subprocess
 import platform
+from concurrent.futures import ProcessPoolExecutor
+from email_parsing import message_text
 
 data_dir = "data/diegoocampoh_emails"
 mbox_files = {
@@ -13,6 +15,12 @@ csv_files = {
     "enron": os.path.join(data_dir, "emails-enron.csv"),
     "phishing": os.path.join(data_dir, "emails-phishing.csv")
 }
+mbox_email_types = {
+    "enron": "safe email",
+    "phishing": "phishing email"
+}
+CHUNK_SIZE = 1000
+OUTPUT_COLUMNS = ["email_text", "email_type"]
 mbox_urls = {
     "enron": "https://raw.githubusercontent.com/diegoocampoh/MachineLearningPhishing/master/code/resources/emails-enron.mbox",
     "phishing": "https://raw.githubusercontent.com/diegoocampoh/MachineLearningPhishing/master/code/resources/emails-phishing.mbox"
@@ -33,26 +41,46 @@ def download_mbox_files():
         except Exception as e:
             print(f"[ERROR] failed downloading {dataset} mbox file: {e}")
 
-# converts mbox files to csv format
+# streams one mbox file message by message into an email_text/email_type csv, writing rows in chunks
+def convert_mbox_file(mbox_path, csv_path, email_type):
+    tmp_path = csv_path + ".tmp"
+    rows = 0
+    mbox = mailbox.mbox(mbox_path, create=False)
+    with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(OUTPUT_COLUMNS)
+        chunk = []
+        for message in mbox:
+            email_text = message_text(message)
+            if not email_text:
+                continue
+            chunk.append([email_text, email_type])
+            if len(chunk) >= CHUNK_SIZE:
+                writer.writerows(chunk)
+                rows += len(chunk)
+                chunk = []
+        writer.writerows(chunk)
+        rows += len(chunk)
+    os.replace(tmp_path, csv_path)
+    return rows
+
+# converts mbox files to csv format, one worker process per mbox file
 def convert_mbox_to_csv(mbox_files, csv_files):
     print("[INFO] starting conversion of mbox files to csv...")
-    for dataset, mbox_path in mbox_files.items():
-        if not os.path.exists(mbox_path):
-            print(f"[ERROR] file not found: {mbox_path}")
-            continue
-        try:
-            mbox = mailbox.mbox(mbox_path)
-            emails = []
-            for message in mbox:
-                subject = message["subject"] if message["subject"] else "No Subject"
-                body = message.get_payload(decode=True)
-                body = body.decode(errors="ignore") if body else "No Content"
-                emails.append({"email_subject": subject, "email_body": body})
-            df = pd.DataFrame(emails)
-            df.to_csv(csv_files[dataset], index=False)
-            print(f"[SUCCESS] finished processing {mbox_path}. Saved -> {csv_files[dataset]}")
-        except Exception as e:
-            print(f"[ERROR] failed processing {mbox_path}: {e}")
+    jobs = {}
+    with ProcessPoolExecutor(max_workers=max(1, min(len(mbox_files), os.cpu_count() or 1))) as pool:
+        for dataset, mbox_path in mbox_files.items():
+            if not os.path.exists(mbox_path):
+                print(f"[ERROR] file not found: {mbox_path}")
+                continue
+            email_type = mbox_email_types.get(dataset, "safe email")
+            jobs[dataset] = pool.submit(convert_mbox_file, mbox_path, csv_files[dataset], email_type)
+        for dataset, job in jobs.items():
+            try:
+                rows = job.result()
+                print(f"[SUCCESS] finished processing {mbox_files[dataset]}. Rows -> {rows}. Saved -> {csv_files[dataset]}")
+            except Exception as e:
+                print(f"[ERROR] failed processing {mbox_files[dataset]}: {e}")
 
 # processes mbox to csv conversion by downloading and converting files
 def main():
@@ -0,0 +1,129 @@
+import os
+import math
+import mmap
+import struct
+import hashlib
+import numpy as np
+
+BLOOM_MAGIC = b"BLOOM001"
+BLOOM_HEADER = struct.Struct("<8sQQQ")
+BUILD_BATCH_SIZE = 100_000
+
+# returns the number of bits and hash functions for a bloom filter of n items at the given false positive rate
+def bloom_parameters(count, fp_rate):
+    count = max(count, 1)
+    num_bits = max(8, math.ceil(-count * math.log(fp_rate) / math.log(2) ** 2))
+    num_hashes = max(1, round(num_bits / count * math.log(2)))
+    return num_bits, num_hashes
+
+# returns the two 64-bit base hashes of an item used for double hashing
+def item_hashes(item):
+    digest = hashlib.blake2b(item.encode("utf-8", errors="ignore"), digest_size=16).digest()
+    return int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+
+# returns the bit positions of an item, computed modulo num_bits so the numpy build gives the same result
+def item_positions(item, num_bits, num_hashes):
+    h1, h2 = item_hashes(item)
+    h1 %= num_bits
+    h2 %= num_bits
+    return [(h1 + i * h2) % num_bits for i in range(num_hashes)]
+
+# builds a bloom filter over the items and saves it as a header followed by the flat bit array
+def build_bloom_filter(items, path, fp_rate):
+    num_bits, num_hashes = bloom_parameters(len(items), fp_rate)
+    bits = np.zeros((num_bits + 7) // 8, dtype=np.uint8)
+    steps = np.arange(num_hashes, dtype=np.uint64)
+    for start in range(0, len(items), BUILD_BATCH_SIZE):
+        hashes = np.array([item_hashes(item) for item in items[start:start + BUILD_BATCH_SIZE]], dtype=np.uint64)
+        h1 = hashes[:, :1] % np.uint64(num_bits)
+        h2 = hashes[:, 1:] % np.uint64(num_bits)
+        positions = ((h1 + steps * h2) % np.uint64(num_bits)).ravel()
+        np.bitwise_or.at(bits, positions >> np.uint64(3), np.left_shift(1, positions & np.uint64(7)).astype(np.uint8))
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(BLOOM_HEADER.pack(BLOOM_MAGIC, num_bits, num_hashes, len(items)))
+        f.write(bits.tobytes())
+    os.replace(tmp_path, path)
+
+# writes the items sorted as utf-8 lines plus an array of line offsets for binary search
+def build_exact_index(items, index_path, offsets_path):
+    encoded = sorted(item.encode("utf-8", errors="ignore") for item in items)
+    offsets = np.zeros(len(encoded) + 1, dtype=np.uint64)
+    tmp_index_path = f"{index_path}.{os.getpid()}.tmp"
+    tmp_offsets_path = f"{offsets_path}.{os.getpid()}.tmp"
+    with open(tmp_index_path, "wb") as f:
+        position = 0
+        for i, item in enumerate(encoded):
+            f.write(item + b"\n")
+            position += len(item) + 1
+            offsets[i + 1] = position
+    with open(tmp_offsets_path, "wb") as f:
+        np.save(f, offsets)
+    os.replace(tmp_index_path, index_path)
+    os.replace(tmp_offsets_path, offsets_path)
+
+# memory-mapped blocklist that answers membership with a bloom filter and confirms hits in the exact index
+class BloomBlocklist:
+    def __init__(self, bloom_path, index_path, offsets_path):
+        with open(bloom_path, "rb") as f:
+            magic, self.num_bits, self.num_hashes, self.count = BLOOM_HEADER.unpack(f.read(BLOOM_HEADER.size))
+        if magic != BLOOM_MAGIC:
+            raise ValueError(f"{bloom_path} is not a bloom filter file")
+        self.bits = np.memmap(bloom_path, dtype=np.uint8, mode="r", offset=BLOOM_HEADER.size)
+        self.offsets = np.load(offsets_path, mmap_mode="r")
+        self.index = b""
+        if os.path.getsize(index_path):
+            with open(index_path, "rb") as f:
+                self.index = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, item):
+        for position in item_positions(item, self.num_bits, self.num_hashes):
+            if not self.bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return self.exact_contains(item)
+
+    # binary searches the sorted on-disk index for the item
+    def exact_contains(self, item):
+        target = item.encode("utf-8", errors="ignore")
+        lo, hi = 0, len(self.offsets) - 1
+        while lo < hi:
+            mid = (lo + hi) // 2
+            value = self.index[int(self.offsets[mid]):int(self.offsets[mid + 1]) - 1]
+            if value == target:
+                return True
+            if value < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        return False
+
+# returns the bloom filter, index and offsets paths that belong to a blocklist text file
+def blocklist_paths(source_path):
+    base = os.path.splitext(source_path)[0]
+    return base + ".bloom", base + ".sorted.txt", base + ".offsets.npy"
+
+# returns True when a saved bloom filter was sized for the given false positive rate
+def bloom_matches_rate(bloom_path, fp_rate):
+    with open(bloom_path, "rb") as f:
+        magic, num_bits, num_hashes, count = BLOOM_HEADER.unpack(f.read(BLOOM_HEADER.size))
+    return magic == BLOOM_MAGIC and (num_bits, num_hashes) == bloom_parameters(count, fp_rate)
+
+# rebuilds the bloom filter and exact index when they are missing, older than the blocklist text file
+# or sized for a different false positive rate
+def ensure_blocklist_files(source_path, fp_rate):
+    paths = blocklist_paths(source_path)
+    source_mtime = os.path.getmtime(source_path)
+    if all(os.path.exists(p) and os.path.getmtime(p) >= source_mtime for p in paths) \
+            and bloom_matches_rate(paths[0], fp_rate):
+        return paths
+    print(f"[INFO] building bloom filter for {source_path} (false positive rate {fp_rate})...")
+    with open(source_path, "r", encoding="utf-8") as f:
+        items = list({line.strip() for line in f if line.strip()})
+    bloom_path, index_path, offsets_path = paths
+    build_exact_index(items, index_path, offsets_path)
+    build_bloom_filter(items, bloom_path, fp_rate)  # written last so a complete filter implies a complete index
+    print(f"[SUCCESS] built bloom filter over {len(items)} entries -> {bloom_path}")
+    return paths
@@ -1,11 +1,17 @@
 import pandas as pd
 import os
+import argparse
 import joblib
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer, CountVectorizer
+import scipy.sparse as sp
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from sklearn.feature_extraction.text import TfidfVectorizer, CountVectorizer, TfidfTransformer
 from sklearn.naive_bayes import MultinomialNB
 from sklearn.utils.class_weight import compute_class_weight
+import url_utils
 from url_utils import extract_urls, check_urls
+from feature_cache import FEATURE_CACHE_DIR, feature_cache_key, load_features, save_features
+from dataset_schema import read_email_dataset, concat_email_frames, LABEL_DTYPE, INVALID_LABEL
 
 DATASET_PATH = "master_email_dataset.csv"
 USER_PROVIDED_PATH = "master_provided_emails.csv"
@@ -13,6 +19,14 @@ MODEL_TFIDF = "naive_bayes_tfidf_model.pkl"
 MODEL_BOW = "naive_bayes_bow_model.pkl"
 VECTORIZER_TFIDF = "tfidf_vectorizer.pkl"
 VECTORIZER_BOW = "bow_vectorizer.pkl"
+N_WORKERS = os.cpu_count() or 1
+MAX_FEATURES = None
+MEMORY_BUDGET_MB = None
+# estimated resident bytes per vocabulary term across both vectorizers and both models
+BYTES_PER_FEATURE = 400
+BUDGET_TOKEN_PATTERN = r"(?u)\b[^\W\d_]{2,30}\b"
+BUDGET_MIN_DF = 2
+BUDGET_MAX_DF = 0.9
 
 SPAM_KEYWORDS = set([
     "ecommerce", "buy", "buy direct", "buy today", "clearance", "as seen on",
@@ -62,11 +76,7 @@ def load_user_provided_data():
     if os.path.exists(USER_PROVIDED_PATH):
         print("[INFO] merging user-provided email dataset...")
         try:
-            user_df = pd.read_csv(
-                USER_PROVIDED_PATH,
-                dtype=str,
-                names=["email_text", "email_type", "email_label"]
-            )
+            user_df = read_email_dataset(USER_PROVIDED_PATH, header=None)
             print(f"[SUCCESS] loaded {len(user_df)} user-provided emails.")
             return user_df
         except Exception as e:
@@ -74,6 +84,12 @@ def load_user_provided_data():
             return pd.DataFrame(columns=["email_text", "email_type", "email_label"])
     return pd.DataFrame(columns=["email_text", "email_type", "email_label"])
 
+# returns per-sample weights from balanced class weights, with phishing weighted twice as heavily
+def compute_sample_weights(labels):
+    class_weights = compute_class_weight("balanced", classes=np.array([0, 1, 2]), y=labels)
+    cw_dict = {lbl: wt * (2 if lbl == 2 else 1) for lbl, wt in zip([0, 1, 2], class_weights)}
+    return [cw_dict[label] for label in labels]
+
 # loads master dataset from internal email database first, merges user-provided data,
 # extracts urls and spam keywords, and adjusts labels based on url risk; keywords are counted but no boost is applied
 def load_data():
@@ -81,61 +97,233 @@ def load_data():
         print("[ERROR] master_email_dataset.csv not found.")
         return None
     try:
-        df = pd.read_csv(DATASET_PATH, dtype=str)
-        df = df[df["email_label"].isin(["0", "1", "2"])]
+        df = read_email_dataset(DATASET_PATH)
+        df = df[df["email_label"].isin([0, 1, 2])]
         print(f"[SUCCESS] loaded {len(df)} emails from master_email_dataset.csv")
     except Exception as e:
         print(f"[ERROR] failed to load dataset: {e}")
         return None
     user_df = load_user_provided_data()
-    df = pd.concat([df, user_df], ignore_index=True).drop_duplicates(subset=["email_text"])
+    df = concat_email_frames([df, user_df]).drop_duplicates(subset=["email_text"])
     if "email_text" not in df.columns or "email_label" not in df.columns:
         print("[ERROR] required columns 'email_text' and 'email_label' not found.")
         return None
     df["email_text"] = df["email_text"].fillna("")
-    df["email_label"] = pd.to_numeric(df["email_label"], errors="coerce")
-    df["email_label"] = df["email_label"].fillna(0).astype(int)
+    df.loc[df["email_label"] == INVALID_LABEL, "email_label"] = 0
     df["urls"] = df["email_text"].apply(extract_urls)
-    df["url_risk"] = df["urls"].apply(lambda urls: check_urls(urls) if urls else 0)
+    df["url_risk"] = df["urls"].apply(lambda urls: check_urls(urls, record=False) if urls else 0)
     df.loc[df["url_risk"] == 2, "email_label"] = 2
-    df["spam_keyword_count"] = df["email_text"].apply(count_spam_keywords)
-    df["spam_boost"] = 1
+    df["spam_keyword_count"] = df["email_text"].apply(count_spam_keywords).astype("int16")
+    df["spam_boost"] = pd.Series(1, index=df.index, dtype=LABEL_DTYPE)
     return df
 
-# trains email classifier models using tfidf and bag of words approaches and saves them
-def train_classifier():
-    print("[INFO] starting email classifier training...")
+# returns the vectorizer settings for training; with a feature or memory budget, rare, overly common and
+# non-alphabetic terms are pruned, the vocabulary is capped and features are stored as float32
+def vectorizer_params(max_features=None, memory_budget_mb=None):
+    if max_features is None and memory_budget_mb is None:
+        return {}
+    if memory_budget_mb is not None:
+        budget_features = int(memory_budget_mb * 1024 ** 2 // BYTES_PER_FEATURE)
+        max_features = budget_features if max_features is None else min(max_features, budget_features)
+    return {
+        "token_pattern": BUDGET_TOKEN_PATTERN,
+        "min_df": BUDGET_MIN_DF,
+        "max_df": BUDGET_MAX_DF,
+        "max_features": max_features,
+        "dtype": np.float32
+    }
+
+# tokenizes and counts one shard of the corpus and returns its vocabulary and count matrix
+def count_shard(texts, token_pattern=CountVectorizer().token_pattern):
+    vectorizer = CountVectorizer(token_pattern=token_pattern)
+    try:
+        counts = vectorizer.fit_transform(texts)
+    except ValueError:
+        return np.array([], dtype=object), sp.csr_matrix((len(texts), 0), dtype=np.int64)
+    return vectorizer.get_feature_names_out(), counts
+
+# merges shard vocabularies into one sorted vocabulary and stacks the shard counts onto its columns
+def merge_shard_counts(results):
+    terms = np.unique(np.concatenate([shard_terms for shard_terms, _ in results]))
+    blocks = []
+    for shard_terms, counts in results:
+        counts = counts.tocoo()
+        columns = np.searchsorted(terms, shard_terms)[counts.col] if len(shard_terms) else counts.col
+        blocks.append(sp.csr_matrix((counts.data, (counts.row, columns)), shape=(counts.shape[0], len(terms))))
+    merged = sp.vstack(blocks, format="csr")
+    merged.sort_indices()
+    return terms, merged
+
+# drops terms outside the min_df/max_df document frequency range and keeps the max_features most frequent,
+# following the same rules as CountVectorizer
+def prune_vocabulary(terms, counts, min_df=1, max_df=1.0, max_features=None):
+    n_docs = counts.shape[0]
+    max_doc_count = max_df if isinstance(max_df, int) else max_df * n_docs
+    min_doc_count = min_df if isinstance(min_df, int) else min_df * n_docs
+    dfs = np.bincount(counts.indices, minlength=counts.shape[1])
+    mask = (dfs <= max_doc_count) & (dfs >= min_doc_count)
+    if max_features is not None and mask.sum() > max_features:
+        tfs = np.asarray(counts.sum(axis=0)).ravel()
+        mask_inds = (-tfs[mask]).argsort()[:max_features]
+        new_mask = np.zeros(len(dfs), dtype=bool)
+        new_mask[np.where(mask)[0][mask_inds]] = True
+        mask = new_mask
+    kept = np.where(mask)[0]
+    return terms[kept], counts[:, kept]
+
+# counts the corpus in parallel shards and returns tf-idf and bow vectorizers and matrices
+# equal to fitting TfidfVectorizer(**params) and CountVectorizer(**params) on the whole corpus
+def parallel_vectorize(texts, n_workers, params=None):
+    params = params or {}
+    shard_size = -(-len(texts) // n_workers)
+    shards = [texts[i:i + shard_size] for i in range(0, len(texts), shard_size)]
+    token_pattern = params.get("token_pattern", CountVectorizer().token_pattern)
+    with ProcessPoolExecutor(max_workers=n_workers) as pool:
+        results = list(pool.map(count_shard, shards, [token_pattern] * len(shards)))
+    terms, X_bow = merge_shard_counts(results)
+    if not len(terms):
+        raise ValueError("empty vocabulary; perhaps the documents only contain stop words")
+    X_bow = X_bow.astype(params.get("dtype", np.int64))
+    terms, X_bow = prune_vocabulary(
+        terms, X_bow, params.get("min_df", 1), params.get("max_df", 1.0), params.get("max_features")
+    )
+    if not len(terms):
+        raise ValueError("After pruning, no terms remain. Try a lower min_df or a higher max_df.")
+    vocabulary = {term: i for i, term in enumerate(terms)}
+    bow_vectorizer = CountVectorizer(**params)
+    bow_vectorizer.vocabulary_ = vocabulary
+    tfidf_vectorizer = TfidfVectorizer(**params)
+    tfidf_vectorizer.vocabulary_ = vocabulary
+    transformer = TfidfTransformer()
+    X_tfidf = transformer.fit_transform(X_bow.astype(params.get("dtype", np.float64)))
+    tfidf_vectorizer.idf_ = transformer.idf_
+    return tfidf_vectorizer, X_tfidf, bow_vectorizer, X_bow
+
+# fits a multinomial naive bayes model with the given sample weights
+def fit_model(X, y, sample_weight):
+    model = MultinomialNB()
+    model.fit(X, y, sample_weight=sample_weight)
+    return model
+
+# vectorizes the corpus with tf-idf and bag of words, in parallel shards when more than one worker is used
+def vectorize_corpus(texts, n_workers, params=None):
+    params = params or {}
+    if n_workers > 1:
+        print(f"[INFO] vectorizing corpus with {n_workers} workers...")
+        return parallel_vectorize(texts, n_workers, params)
+    print("[INFO] vectorizing corpus...")
+    tfidf_vectorizer = TfidfVectorizer(**params)
+    X_tfidf = tfidf_vectorizer.fit_transform(texts)
+    bow_vectorizer = CountVectorizer(**params)
+    X_bow = bow_vectorizer.fit_transform(texts)
+    for vectorizer in (tfidf_vectorizer, bow_vectorizer):
+        if hasattr(vectorizer, "stop_words_"):
+            del vectorizer.stop_words_
+    return tfidf_vectorizer, X_tfidf, bow_vectorizer, X_bow
+
+# returns the numeric risk from a url_risk value, which check_urls returns as a (risk, source) tuple
+def url_risk_value(risk):
+    return risk[0] if isinstance(risk, tuple) else int(risk)
+
+# loads and vectorizes the training data, adding placeholder emails for missing labels,
+# and returns the features, label vector and url risk column
+def build_features(n_workers, params=None):
     df = load_data()
     if df is None or df.empty:
-        print("[ERROR] dataset is empty. skipping training.")
-        return
+        return None
     unique_labels = np.unique(df["email_label"])
     missing_labels = set([0, 1, 2]) - set(unique_labels)
     if missing_labels:
         missing_data = pd.DataFrame({
             "email_text": ["placeholder email"] * len(missing_labels),
-            "email_label": list(missing_labels)
+            "email_label": list(missing_labels),
+            "url_risk": [0] * len(missing_labels)
         })
         df = pd.concat([df, missing_data], ignore_index=True)
-    class_weights = compute_class_weight("balanced", classes=np.array([0, 1, 2]), y=df["email_label"])
-    cw_dict = {lbl: wt * (2 if lbl == 2 else 1) for lbl, wt in zip([0, 1, 2], class_weights)}
-    print("[INFO] training tf-idf model...")
-    tfidf_vectorizer = TfidfVectorizer()
-    X_train_tfidf = tfidf_vectorizer.fit_transform(df["email_text"])
-    nb_tfidf = MultinomialNB()
-    nb_tfidf.fit(X_train_tfidf, df["email_label"], sample_weight=[cw_dict[label] for label in df["email_label"]])
-    print("[SUCCESS] finished training tf-idf model.")
-    print("[INFO] training bag of words model...")
-    bow_vectorizer = CountVectorizer()
-    X_train_bow = bow_vectorizer.fit_transform(df["email_text"])
-    nb_bow = MultinomialNB()
-    nb_bow.fit(X_train_bow, df["email_label"], sample_weight=[cw_dict[label] for label in df["email_label"]])
-    print("[SUCCESS] finished training bag of words model.")
-    joblib.dump(nb_tfidf, MODEL_TFIDF)
-    joblib.dump(tfidf_vectorizer, VECTORIZER_TFIDF)
-    joblib.dump(nb_bow, MODEL_BOW)
-    joblib.dump(bow_vectorizer, VECTORIZER_BOW)
+    features = vectorize_corpus(df["email_text"].tolist(), n_workers, params)
+    labels = df["email_label"].to_numpy(dtype=LABEL_DTYPE)
+    url_risk = df["url_risk"].map(url_risk_value).to_numpy(dtype=LABEL_DTYPE)
+    return features, labels, url_risk
+
+# returns the feature cache key for the current training data, url databases and vectorizer settings
+def training_cache_key(params=None):
+    paths = [
+        DATASET_PATH,
+        USER_PROVIDED_PATH,
+        url_utils.MASTER_DATASET_PATH,
+        url_utils.USER_PROVIDED_PATH,
+        url_utils.CACHE_FILE
+    ]
+    params = params or {}
+    config = {"tfidf": TfidfVectorizer(**params).get_params(), "bow": CountVectorizer(**params).get_params()}
+    return feature_cache_key(paths, config)
+
+# returns the on-disk size in bytes of the saved models and vectorizers
+def artifact_bytes():
+    return sum(os.path.getsize(p) for p in (MODEL_TFIDF, VECTORIZER_TFIDF, MODEL_BOW, VECTORIZER_BOW))
+
+# trains email classifier models using tfidf and bag of words approaches and saves them;
+# features are reused from the feature cache when the inputs are unchanged, and with more than
+# one worker the corpus is vectorized in parallel shards and the models are fitted and saved concurrently;
+# max_features or memory_budget_mb switch to the pruned float32 vocabulary from vectorizer_params
+def train_classifier(n_workers=N_WORKERS, use_cache=True, max_features=MAX_FEATURES, memory_budget_mb=MEMORY_BUDGET_MB):
+    print("[INFO] starting email classifier training...")
+    params = vectorizer_params(max_features, memory_budget_mb)
+    if params:
+        print(f"[INFO] training with a feature budget of {params['max_features']} terms.")
+    key = training_cache_key(params) if use_cache and os.path.exists(DATASET_PATH) else None
+    cached = load_features(key) if key else None
+    if cached is not None:
+        print(f"[INFO] reusing cached features from {FEATURE_CACHE_DIR}/{key}.")
+        features, labels, url_risk = cached
+    else:
+        built = build_features(n_workers, params)
+        if built is None:
+            print("[ERROR] dataset is empty. skipping training.")
+            return
+        features, labels, url_risk = built
+        if key:
+            save_features(key, features, labels, url_risk)
+            print(f"[INFO] cached features -> {FEATURE_CACHE_DIR}/{key}")
+    tfidf_vectorizer, X_train_tfidf, bow_vectorizer, X_train_bow = features
+    sample_weight = compute_sample_weights(labels)
+    artifacts = {VECTORIZER_TFIDF: tfidf_vectorizer, VECTORIZER_BOW: bow_vectorizer}
+    if n_workers > 1:
+        print("[INFO] training tf-idf and bag of words models...")
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            tfidf_job = pool.submit(fit_model, X_train_tfidf, labels, sample_weight)
+            bow_job = pool.submit(fit_model, X_train_bow, labels, sample_weight)
+            artifacts[MODEL_TFIDF] = tfidf_job.result()
+            artifacts[MODEL_BOW] = bow_job.result()
+        print("[SUCCESS] finished training tf-idf and bag of words models.")
+        with ThreadPoolExecutor(max_workers=len(artifacts)) as pool:
+            jobs = [pool.submit(joblib.dump, artifact, path) for path, artifact in artifacts.items()]
+            for job in jobs:
+                job.result()
+    else:
+        print("[INFO] training tf-idf model...")
+        artifacts[MODEL_TFIDF] = fit_model(X_train_tfidf, labels, sample_weight)
+        print("[SUCCESS] finished training tf-idf model.")
+        print("[INFO] training bag of words model...")
+        artifacts[MODEL_BOW] = fit_model(X_train_bow, labels, sample_weight)
+        print("[SUCCESS] finished training bag of words model.")
+        for path, artifact in artifacts.items():
+            joblib.dump(artifact, path)
+    print(f"[INFO] vocabulary: {len(bow_vectorizer.vocabulary_)} terms | "
+          f"saved artifacts: {artifact_bytes() / 1024 ** 2:.1f} MB")
     print("[SUCCESS] finished email classifier training. models saved.")
 
+# parses command line arguments and trains the classifier, optionally with a feature or memory budget
+def main():
+    parser = argparse.ArgumentParser(description="Train the tf-idf and bag of words email classifiers.")
+    parser.add_argument("--workers", type=int, default=N_WORKERS)
+    parser.add_argument("--no-cache", action="store_true", help="rebuild features instead of using the feature cache")
+    parser.add_argument("--max-features", type=int, default=MAX_FEATURES,
+                        help="cap the vocabulary and switch to pruned float32 features")
+    parser.add_argument("--memory-budget-mb", type=float, default=MEMORY_BUDGET_MB,
+                        help="derive the vocabulary cap from an estimated memory budget")
+    args = parser.parse_args()
+    train_classifier(args.workers, not args.no_cache, args.max_features, args.memory_budget_mb)
+
 if __name__ == "__main__":
-    train_classifier()
+    main()
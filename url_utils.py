@@ -1,7 +1,5 @@
-import requests
 import re
 import os
-import pandas as pd
 
 MASTER_DATASET_PATH = "master_url_dataset.csv"
 USER_PROVIDED_PATH = "user_provided_urls.csv"
@@ -12,18 +10,24 @@ PHISHING_URLS = [
 ]
 CACHE_DIR = "data/external_phishing_checker"
 CACHE_FILE = os.path.join(CACHE_DIR, "phishing_urls.txt")
-os.makedirs(CACHE_DIR, exist_ok=True)
+# "set" holds the blocklist in memory; "bloom" memory-maps a bloom filter backed by an exact on-disk index
+BLOCKLIST_MODE = "set"
+BLOOM_FALSE_POSITIVE_RATE = 0.001
 url_mapping = {}
+phishing_urls_cache = None
 
 # loads the master url dataset and updates the global url_mapping dictionary
 def load_master_url_dataset():
     global url_mapping
+    import pandas as pd
+    from dataset_schema import read_url_dataset, compact_url_frame, INVALID_LABEL
     print("[INFO] starting master url dataset creation...")
     try:
-        url_dataset = pd.read_csv(MASTER_DATASET_PATH, dtype=str, low_memory=False)
-        user_dataset = pd.read_csv(USER_PROVIDED_PATH, dtype=str, low_memory=False) if os.path.exists(USER_PROVIDED_PATH) else pd.DataFrame(columns=["url", "label"])
+        url_dataset = read_url_dataset(MASTER_DATASET_PATH)
+        user_dataset = read_url_dataset(USER_PROVIDED_PATH, header=None) if os.path.exists(USER_PROVIDED_PATH) else compact_url_frame(pd.DataFrame(columns=["url", "label"]))
         combined_dataset = pd.concat([url_dataset, user_dataset], ignore_index=True).drop_duplicates(subset=["url"])
-        url_mapping = {row["url"]: int(float(row["label"])) for _, row in combined_dataset.iterrows()}
+        combined_dataset = combined_dataset[combined_dataset["label"] != INVALID_LABEL].dropna(subset=["url"])
+        url_mapping = dict(zip(combined_dataset["url"].tolist(), combined_dataset["label"].tolist()))
         print(f"[SUCCESS] loaded {len(url_mapping)} urls from combined master dataset.")
     except Exception as e:
         print(f"[ERROR] failed to load master dataset ({e}).")
@@ -31,6 +35,7 @@ def load_master_url_dataset():
 
 # downloads the latest phishing database files and saves them to the cache file
 def fetch_phishing_database():
+    import requests
     print("[INFO] fetching latest phishing database...")
     phishing_data = set()
     for source_url in PHISHING_URLS:
@@ -42,13 +47,14 @@ def fetch_phishing_database():
         except Exception as e:
             print(f"[ERROR] failed to fetch phishing database from {source_url} ({e}). skipping this source.")
     if phishing_data:
+        os.makedirs(CACHE_DIR, exist_ok=True)
         with open(CACHE_FILE, "w", encoding="utf-8") as f:
             f.write("\n".join(phishing_data))
         print(f"[SUCCESS] phishing database updated. saved at {CACHE_FILE}")
     else:
         print("[ERROR] all phishing database sources failed.")
 
-# loads phishing urls from the cached file and returns them as a set
+# loads phishing urls from the cached file and returns them as a set, or None when they cannot be loaded
 def load_phishing_urls():
     print("[INFO] loading cached phishing urls...")
     if not os.path.exists(CACHE_FILE):
@@ -59,8 +65,34 @@ def load_phishing_urls():
         print(f"[SUCCESS] loaded {len(phishing_urls)} phishing urls from cache.")
         return phishing_urls
     except Exception as e:
-        print(f"[ERROR] failed to load phishing database ({e}). returning empty set.")
-        return set()
+        print(f"[ERROR] failed to load phishing database ({e}). will retry on the next check.")
+        return None
+
+# loads the cached phishing urls as a memory-mapped bloom filter with exact confirmation of hits,
+# or returns None when they cannot be loaded
+def load_phishing_blocklist():
+    from phishing_blocklist import BloomBlocklist, ensure_blocklist_files
+    print("[INFO] loading phishing url bloom filter...")
+    if not os.path.exists(CACHE_FILE):
+        fetch_phishing_database()
+    try:
+        blocklist = BloomBlocklist(*ensure_blocklist_files(CACHE_FILE, BLOOM_FALSE_POSITIVE_RATE))
+        print(f"[SUCCESS] loaded bloom filter over {len(blocklist)} phishing urls.")
+        return blocklist
+    except Exception as e:
+        print(f"[ERROR] failed to load phishing bloom filter ({e}). will retry on the next check.")
+        return None
+
+# returns the phishing url blocklist for the configured mode; a successful load is kept for later calls,
+# while a failed one returns an empty set and is retried on the next call
+def get_phishing_urls():
+    global phishing_urls_cache
+    if phishing_urls_cache is None:
+        if BLOCKLIST_MODE == "bloom":
+            phishing_urls_cache = load_phishing_blocklist()
+        else:
+            phishing_urls_cache = load_phishing_urls()
+    return phishing_urls_cache if phishing_urls_cache is not None else set()
 
 # extracts both full URLs and raw domain names from text
 def extract_urls(text):
@@ -78,15 +110,18 @@ def extract_urls(text):
             extracted_domains.add(item)
     return list(set(extracted) | extracted_domains)  # Remove duplicates
 
-# checks if any extracted url or domain is in the master dataset or in the phishing database and returns a risk tuple
-def check_urls(urls):
+# checks if any extracted url or domain is in the master dataset or in the phishing database and returns a risk tuple;
+# callers checking many emails can pass an already loaded phishing url set, and record=False keeps
+# external hits out of the user-provided url database
+def check_urls(urls, phishing_urls=None, record=True):
     print("[INFO] checking urls against databases...")
     if not urls:
         print("[INFO] no urls found. skipping check.")
         return (0, "none")
     if not url_mapping:
         load_master_url_dataset()
-    phishing_urls = load_phishing_urls()
+    if phishing_urls is None:
+        phishing_urls = get_phishing_urls()
     for url in urls:
         domain = url.split("/")[2] if "://" in url else url
         if url in url_mapping:
@@ -98,9 +133,10 @@ def check_urls(urls):
                 return (0, "internal")
         if domain in phishing_urls:
             print(f"[INFO] detected phishing domain from external database: {domain}")
-            with open(USER_PROVIDED_PATH, "a") as f:
-                f.write(f"{url},2\n")
-            print(f"[INFO] added {url} to internal phishing database.")
+            if record:
+                with open(USER_PROVIDED_PATH, "a") as f:
+                    f.write(f"{url},2\n")
+                print(f"[INFO] added {url} to internal phishing database.")
             return (2, "external")
     print("[INFO] no threats detected in provided urls.")
     return (0, "none")